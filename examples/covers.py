@@ -1,5 +1,6 @@
 from re import X
 import cadquery as cq
+import functools
 import gridfinity
 
 #The height of the label lip on divider bins.
@@ -64,6 +65,36 @@ def topplate(w, h):
     
     return with_cutouts
 
+@functools.lru_cache(maxsize=None)
+def midplate_pocket():
+    """Generate the tool that cuts one cell's stacking pocket into the top of a
+    midplate, with its lip already chamfered and filleted.
+
+    The tool leaves the top of the midplate alone around the edge of the
+    cell, so neighbouring pockets cut side by side leave a wall between
+    them, just like two blocks stacked next to each other."""
+
+    return gridfinity.stacking_lip_tool(1, 1,
+        inset=gridfinity.block_spacing / 2 + gridfinity.block_stacking_lip / 2,
+        lip_fillet=gridfinity.block_stacking_lip / 2)\
+        .moved(cq.Location(cq.Vector(0, 0, gridfinity.block_extrusion(1))))
+
+def missing_pockets(plate, w, h):
+    """List the (i, j) cells of a midplate that didn't get a stacking
+    pocket, by looking for the floor of each cell's pocket."""
+
+    floor = gridfinity.block_extrusion(1) - gridfinity.stacking_mating_depth
+    found = set()
+
+    for face in plate.findSolid().Faces():
+        center = face.Center()
+
+        if abs(center.z - floor) < 1e-3 and face.normalAt(center).z > 0.999:
+            found.add((round(center.x / gridfinity.grid_unit + (w - 1) / 2),
+                       round(center.y / gridfinity.grid_unit + (h - 1) / 2)))
+
+    return [(i, j) for i in range(0, w) for j in range(0, h) if (i, j) not in found]
+
 def midplate(w, h):
     """Generate a vertical divider, which is essentially a thin baseplate that
     can be stacked on top of other storage blocks.
@@ -71,43 +102,24 @@ def midplate(w, h):
     The purpose of vertical dividers are to prevent blocks with magnets from
     magnetizing parts in divider bins stacked below them. They're sort of like
     weighted baseplates, except they are sized to stack as if they were 1x tall
-    blocks."""
+    blocks.
+
+    Every cell's pocket is cut in one go with a finished 1x1 pocket tool.
+    Raises ValueError if any cell is left without a pocket."""
+
+    pocket = midplate_pocket()
 
     with_cutouts = cq.Workplane("XY")\
         .gridfinity_block(w, h, 1)\
         .gridfinity_block_lip(w, h, holes=False)\
-        .faces(">Z")\
         .rarray(gridfinity.grid_unit, gridfinity.grid_unit, w, h)\
-        .eachpoint(lambda c: cq.Workplane("XY")\
-                .placeSketch(gridfinity.inset_profile(1, 1, gridfinity.block_mating_inset))\
-                .extrude(gridfinity.stacking_mating_depth * -1)\
-                .val()\
-                .moved(c)\
-                .moved(cq.Location(cq.Vector(0, 0, gridfinity.block_extrusion(1)))),
-            combine="cut",
-            clean=True)
-    
-    filleted = with_cutouts
-    
-    for i in range(0, w):
-        for j in range(0, h):
-            x = (i * gridfinity.grid_unit) - (w * gridfinity.grid_unit / 2) + gridfinity.block_mating_inset
-            y = (j * gridfinity.grid_unit) - (h * gridfinity.grid_unit / 2) + gridfinity.block_mating_inset
-            z = gridfinity.block_extrusion(1)
-
-            try:
-                filleted = filleted\
-                    .edges(cq.NearestToPointSelector([x + gridfinity.grid_unit / 2, y + gridfinity.grid_unit / 2, z]))\
-                    .chamfer(gridfinity.block_mating_inset - gridfinity.block_spacing * 0.5 - gridfinity.block_stacking_lip)\
-                    .edges(cq.NearestToPointSelector([x + gridfinity.grid_unit / 2, y + gridfinity.grid_unit / 2, z - gridfinity.block_mating_depth]))\
-                    .chamfer(gridfinity.block_stacking_chamfer)\
-                    .faces(">Z")\
-                    .edges(cq.NearestToPointSelector([x, y, z]))\
-                    .fillet(gridfinity.block_stacking_lip / 2)
-            except:
-                continue
+        .eachpoint(lambda c: pocket.moved(c), combine="cut", clean=True)
+
+    missing = missing_pockets(with_cutouts, w, h)
+    if len(missing) > 0:
+        raise ValueError(f"{w}x{h} midplate is missing pockets in cells {missing}")
     
-    return filleted\
+    return with_cutouts\
             .faces(">Z")\
             .edges(cq.NearestToPointSelector([(w * gridfinity.grid_unit / 2), (h * gridfinity.grid_unit / 2), gridfinity.block_extrusion(1)]))\
             .fillet(gridfinity.block_stacking_lip / 2)
@@ -1,6 +1,9 @@
 import cadquery as cq
-import gridfinity
+import functools
+import gridfinity, gridfinity_layout
 from math import pow, e, cos, pi, sin, floor
+from OCP.BRepPrimAPI import BRepPrimAPI_MakePrism
+from OCP.gp import gp_Vec
 
 tolerance = 0.25
 
@@ -18,6 +21,15 @@ tolerance = 0.25
 # or delete all the fillet calls that use this.
 fillet_radius = 0.75
 
+# How deep allen key holes need to be when the block depth is picked
+# automatically. This is as deep as a depth 3 block allows.
+allen_key_hole_depth = 15
+
+# Space between each allen key hole and its label, and between footprints,
+# when holes are packed instead of laid out on a spiral. Fillets fail when
+# holes touch.
+label_gap = 1
+
 def allen_key_profile(across_flat_dia):
     """Generate the profile of an allen key wrench with a given across-flats
     diameter."""
@@ -32,27 +44,25 @@ def optimal_point_distance(physical_widths):
     points/sides as there are allen keys to accomodate."""
     return physical_widths[0] + 5.5 * len(physical_widths)
 
-def allen_key_cutout_generator(points, depth, distance):
-    """Create an allen key cutout generator function for use with cuteach.
-    
-    Each generator should only be used once as there is internal closure state
-    that may not reset properly if reused."""
-    i = 0
+def allen_key_placements(physical_widths, distance):
+    """Calculate where the hole for each allen key goes on the top surface of
+    the block, as a list of (x, y) points in the same order as the keys.
 
-    def inner(p):
-        nonlocal i
+    The keys start out evenly spaced around a polygon `distance` across, and
+    are then pulled into a logarithmic spiral."""
 
-        key_dia = points[i % len(points)]
+    placements = []
 
-        old_p = list(p.toTuple()[0])
-        phi = ((i % len(points))) / len(points)
+    for i in range(len(physical_widths)):
+        angle = 2 * pi / len(physical_widths) * i
+        old_p = [distance / 2 * cos(angle), distance / 2 * sin(angle)]
+        phi = i / len(physical_widths)
 
         beta = 25 * pi / 180 #Increasing this constant ROTATES all the labels CLOCKWISE in DEGREES
 
         p = [
             cos(beta) * old_p[0] - sin(beta) * old_p[1],
             sin(beta) * old_p[0] + cos(beta) * old_p[1],
-            old_p[2]
         ]
 
         # Ok, here's how the logarithmic spiral logic works:
@@ -62,11 +72,102 @@ def allen_key_cutout_generator(points, depth, distance):
         # The second division scales all the points by a constant.
         p[0] = (p[0] / pow(e, phi) - distance / 15) / 1.5
         p[1] = (p[1] / pow(e, phi) - distance / 15) / 1.5
-        
+
+        placements.append((p[0], p[1]))
+
+    return placements
+
+def allen_key_radius(physical_width):
+    """Calculate the radius of an allen key hole's footprint on the top
+    surface, including the tolerance and the fillet around the top of it."""
+    return gridfinity_layout.hex_circumradius(physical_width) + tolerance / 2 + fillet_radius
+
+def check_allen_key_placements(widths, physical_widths, placements, square_block_size):
+    """Make sure no two allen key holes run into each other, and that none of
+    them cut into the stacking lip, before spending any time on booleans.
+
+    Hole footprints include the tolerance and the fillet around the top of the
+    hole. Raises ValueError listing every key that doesn't fit."""
+
+    radii = [allen_key_radius(w) for w in physical_widths]
+
+    overlapping, outside = gridfinity_layout.placement_problems(placements, radii,
+        square_block_size, square_block_size)
+
+    problems = [f"{widths[i]} and {widths[j]} overlap" for i, j in overlapping]
+    problems.extend(f"{widths[i]} cuts into the stacking lip" for i in outside)
+
+    if len(problems) > 0:
+        raise ValueError(f"Allen keys {widths} don't fit a {square_block_size}x{square_block_size} block: "
+                         + ", ".join(problems))
+
+def allen_key_footprints(physical_widths, labels):
+    """Calculate the footprint of each allen key hole with its label to the
+    right of it, for `gridfinity_layout.pack`."""
+
+    footprints = []
+
+    for physical_width, label in zip(physical_widths, labels):
+        radius = allen_key_radius(physical_width)
+        bb = cq.Compound.makeCompound(label).BoundingBox()
+        x = radius + label_gap
+
+        footprints.append([(0, 0, radius)]
+            + gridfinity_layout.rectangle_footprint(x + bb.xmin, bb.ymin, x + bb.xmax, bb.ymax))
+
+    return footprints
+
+def packed_allen_key_layout(widths, physical_widths, square_block_size, imperial = False):
+    """Lay out allen key holes with `gridfinity_layout.pack` instead of the
+    spiral, with each key's label to the right of its hole.
+
+    Returns the hole placements, the label placements, and the labels."""
+
+    labels = [allen_key_label(w, imperial) for w in widths]
+    footprints = allen_key_footprints(physical_widths, labels)
+
+    placements = gridfinity_layout.pack(footprints, square_block_size, square_block_size,
+        clearance=label_gap)
+    label_placements = [(x + allen_key_radius(w) + label_gap, y)
+                        for (x, y), w in zip(placements, physical_widths)]
+
+    return placements, label_placements, labels
+
+def allen_key_block_size(widths, physical_widths, imperial = False, layout = "spiral", max_size = 6):
+    """Find the smallest square block that a set of allen keys fits in,
+    without building anything."""
+
+    if layout == "packed":
+        labels = [allen_key_label(w, imperial) for w in widths]
+        fits = gridfinity_layout.footprints_fit(allen_key_footprints(physical_widths, labels),
+            clearance=label_gap)
+    else:
+        placements = allen_key_placements(physical_widths, optimal_point_distance(physical_widths))
+        radii = [allen_key_radius(w) for w in physical_widths]
+
+        def fits(width, height):
+            overlapping, outside = gridfinity_layout.placement_problems(placements, radii, width, height)
+            return len(overlapping) == 0 and len(outside) == 0
+
+    size, _, _ = gridfinity_layout.smallest_block(fits, square=True, max_size=max_size)
+
+    return size
+
+def allen_key_cutout_generator(points, depth):
+    """Create an allen key cutout generator function for use with cutEach.
+
+    Each generator should only be used once as there is internal closure state
+    that may not reset properly if reused."""
+    i = 0
+
+    def inner(loc):
+        nonlocal i
+
+        key_dia = points[i % len(points)]
         i += 1
 
         return allen_key_profile(key_dia)\
-            .translate(tuple(p))\
+            .moved(loc)\
             .translate((0, 0, -gridfinity.block_cut_limit(depth)))
 
     return inner
@@ -93,38 +194,90 @@ def decimal_to_binary_fraction(val):
     
     return val
 
-def frac_text(self, whole_txt, numerator_txt, denominator_txt, fontsize,
-        distance, cut=True, combine=False, clean=True, font="Arial",
-        fontPath=None, kind='regular', halign='center', valign='center'):
-    """Generate a solid for a fractional quantity with a whole part, numerator,
-    and denominator."""
-    
+## Labels
+##
+## Every label is laid out from cached glyph outlines: each character is
+## shaped by the font engine once per font and size, no matter how many labels
+## use it, and a label is extruded in one go without fusing anything.
+
+@functools.lru_cache(maxsize=None)
+def glyph(char, fontsize, font="Ubuntu", fontPath=None, kind="regular"):
+    """Shape a single character and return its outline and advance width.
+
+    The outline is a list of faces on the XY plane with the pen at the origin
+    and the baseline at Y=0. The advance is measured by shaping the character
+    between two zeroes, which also works for spaces."""
+
+    def shape(txt):
+        return cq.Compound.makeText(txt, fontsize, 1, font=font, fontPath=fontPath,
+            kind=kind, halign="left", valign="bottom")
+
+    advance = shape("0" + char + "0").BoundingBox().xmax - shape("00").BoundingBox().xmax
+
+    if char.isspace():
+        return [], advance
+
+    outline = [f.moved(cq.Location(cq.Vector(0, 0, -1)))
+               for f in shape(char).Faces() if f.normalAt().z > 0.5]
+
+    return outline, advance
+
+@functools.lru_cache(maxsize=None)
+def font_lines(fontsize, font="Ubuntu", fontPath=None, kind="regular"):
+    """Find where the font engine puts the baseline for each vertical
+    alignment, relative to where `valign="bottom"` puts it."""
+
+    def baseline(valign):
+        return cq.Compound.makeText("0", fontsize, 1, font=font, fontPath=fontPath,
+            kind=kind, halign="left", valign=valign).BoundingBox().ymin
+
+    return {valign: baseline(valign) - baseline("bottom") for valign in ("top", "center", "bottom")}
+
+def text_outline(txt, fontsize, font="Ubuntu", fontPath=None, kind="regular",
+        halign="center", valign="center"):
+    """Lay out a line of text from cached glyphs.
+
+    Returns the list of faces and the total advance width. Alignment works
+    the same way as `Workplane.text`."""
+
+    faces = []
+    x = 0
+
+    for char in txt:
+        outline, advance = glyph(char, fontsize, font, fontPath, kind)
+        faces.extend(f.moved(cq.Location(cq.Vector(x, 0, 0))) for f in outline)
+        x += advance
+
+    dx = {"left": 0, "center": x / -2, "right": x * -1}[halign]
+    dy = font_lines(fontsize, font, fontPath, kind)[valign]
+
+    return [f.moved(cq.Location(cq.Vector(dx, dy, 0))) for f in faces], x
+
+def frac_outline(whole_txt, numerator_txt, denominator_txt, fontsize,
+        font="Ubuntu", fontPath=None, kind="regular", halign="center", valign="center"):
+    """Lay out a stacked fraction with a whole part, numerator and
+    denominator from cached glyphs, as a list of faces."""
+
+    options = dict(font=font, fontPath=fontPath, kind=kind, halign="left", valign="top")
+
     if whole_txt.strip() != "":
-        whole = cq.Compound.makeText(whole_txt, fontsize, distance, font=font,
-            fontPath=fontPath, kind=kind, halign='left', valign='top',
-            position=self.plane)
+        whole, _ = text_outline(whole_txt, fontsize, **options)
 
         #TODO: the space width is a guess because Compound.makeText trims strings
-        whole_width = whole.BoundingBox().xlen + fontsize / 6
+        whole_width = cq.Compound.makeCompound(whole).BoundingBox().xlen + fontsize / 6
     else:
-        whole = cq.Compound.makeCompound([])
+        whole = []
         whole_width = 0
-    
-    numerator = cq.Compound.makeText(numerator_txt, fontsize / 2, distance,
-        font=font, fontPath=fontPath, kind=kind, halign='left', valign='top',
-        position=self.plane)
-    
-    numerator_bb = numerator.BoundingBox()
+
+    numerator, _ = text_outline(numerator_txt, fontsize / 2, **options)
+
+    numerator_bb = cq.Compound.makeCompound(numerator).BoundingBox()
     numerator_width = numerator_bb.xmin * 2 + numerator_bb.xlen
-    #TODO: Check self.plane to see if the coordinates get reversed or not like
-    #in here
     numerator_height = abs(numerator_bb.ymax - numerator_bb.ylen)
-    
-    denominator = cq.Compound.makeText(denominator_txt, fontsize / 2, distance,
-        font=font, fontPath=fontPath, kind=kind, halign='left', valign='top',
-        position=self.plane)
-    
-    denominator_bb = denominator.BoundingBox()
+
+    denominator, _ = text_outline(denominator_txt, fontsize / 2, **options)
+
+    denominator_bb = cq.Compound.makeCompound(denominator).BoundingBox()
     denominator_width = denominator_bb.xmin * 2 + denominator_bb.xlen
 
     fraction_width = max(numerator_width, denominator_width)
@@ -137,26 +290,23 @@ def frac_text(self, whole_txt, numerator_txt, denominator_txt, fontsize,
     bar_height = fontsize / 16
     bar_spacing = fontsize / 32
     bar_y = numerator_height
-    bar = cq.Workplane(self.plane)\
-        .moveTo(0, -bar_y + bar_height / 2)\
-        .lineTo(fraction_width, -bar_y + bar_height / 2)\
-        .lineTo(fraction_width, -bar_y - bar_height / 2)\
-        .lineTo(0, -bar_y - bar_height / 2)\
-        .close()\
-        .extrude(distance)\
-        .val()
-    
+    bar = cq.Face.makeFromWires(cq.Wire.makePolygon([
+        cq.Vector(whole_width, -bar_y + bar_height / 2, 0),
+        cq.Vector(whole_width + fraction_width, -bar_y + bar_height / 2, 0),
+        cq.Vector(whole_width + fraction_width, -bar_y - bar_height / 2, 0),
+        cq.Vector(whole_width, -bar_y - bar_height / 2, 0),
+        cq.Vector(whole_width, -bar_y + bar_height / 2, 0),
+    ]))
+
     numerator_y = bar_height / 2 + bar_spacing
     denominator_y = -numerator_height - bar_height / 2 - bar_spacing
-    
-    together = whole\
-        .fuse(bar.move(cq.Location(cq.Vector(whole_width, 0, 0))))\
-        .fuse(numerator.move(cq.Location(cq.Vector(whole_width + numerator_offset, numerator_y, 0))))\
-        .fuse(denominator.move(cq.Location(cq.Vector(whole_width + denominator_offset, denominator_y, 0))))\
-        .move(cq.Location(cq.Vector(0, -numerator_y, 0)))
-    
-    #TODO: Again, check the workplane for coordinate reversals at some point
-    together_bb = together.BoundingBox()
+
+    faces = whole + [bar]\
+        + [f.moved(cq.Location(cq.Vector(whole_width + numerator_offset, numerator_y, 0))) for f in numerator]\
+        + [f.moved(cq.Location(cq.Vector(whole_width + denominator_offset, denominator_y, 0))) for f in denominator]
+    faces = [f.moved(cq.Location(cq.Vector(0, -numerator_y, 0))) for f in faces]
+
+    together_bb = cq.Compound.makeCompound(faces).BoundingBox()
     together_x = 0
     together_y = 0
 
@@ -164,14 +314,34 @@ def frac_text(self, whole_txt, numerator_txt, denominator_txt, fontsize,
         together_x = (together_bb.xmin + together_bb.xlen) / 2
     elif halign == 'right':
         together_x = together_bb.xmin + together_bb.xlen
-    
+
     if valign == 'center':
         together_y = abs(together_bb.ymax + together_bb.ylen) / 2
-    elif valign == 'right':
+    elif valign == 'bottom':
         together_y = abs(together_bb.ymax + together_bb.ylen)
-    
-    together = together.move(cq.Location(cq.Vector(-together_x, together_y, 0)))
-    
+
+    return [f.moved(cq.Location(cq.Vector(-together_x, together_y, 0))) for f in faces]
+
+def extrude_outline(faces, distance):
+    """Extrude a list of faces on the XY plane straight up, all at once."""
+
+    prism = BRepPrimAPI_MakePrism(cq.Compound.makeCompound(faces).wrapped, gp_Vec(0, 0, distance))
+
+    return cq.Shape.cast(prism.Shape())
+
+def frac_text(self, whole_txt, numerator_txt, denominator_txt, fontsize,
+        distance, cut=True, combine=False, clean=True, font="Arial",
+        fontPath=None, kind='regular', halign='center', valign='center'):
+    """Generate a solid for a fractional quantity with a whole part, numerator,
+    and denominator.
+
+    `halign` is 'left', 'center' or 'right', and `valign` is 'top', 'center'
+    or 'bottom'."""
+
+    together = extrude_outline(frac_outline(whole_txt, numerator_txt, denominator_txt,
+        fontsize, font, fontPath, kind, halign, valign), distance)\
+        .transformShape(self.plane.rG)
+
     if cut:
         combine = 'cut'
     
@@ -179,6 +349,31 @@ def frac_text(self, whole_txt, numerator_txt, denominator_txt, fontsize,
 
 cq.Workplane.frac_text = frac_text
 
+def allen_key_label(key_dia, imperial=False):
+    """Lay out the label for an allen key as a list of faces, starting at the
+    origin and vertically centered on it."""
+
+    if imperial:
+        label_dia = decimal_to_binary_fraction(key_dia)
+    else:
+        label_dia = key_dia
+
+    if type(label_dia) is tuple:
+        whole = label_dia[0]
+        if whole == 0:
+            whole = ""
+        else:
+            whole = str(whole)
+
+        nom = str(label_dia[1])
+        denom = str(label_dia[2])
+
+        return frac_outline(whole, nom, denom, 10, font="Ubuntu", halign='left')
+    else:
+        label, _ = text_outline(str(label_dia), 6 - 0.2 * (len(str(label_dia)) - 1), font="Ubuntu", halign='left')
+
+        return label
+
 def allen_key_label_generator(points, distance, square_block_size, imperial = False):
     """Create an allen key label generator function for use with eachpoint.
     
@@ -192,11 +387,6 @@ def allen_key_label_generator(points, distance, square_block_size, imperial = Fa
 
         key_dia = points[i % len(points)]
 
-        if imperial:
-            label_dia = decimal_to_binary_fraction(key_dia)
-        else:
-            label_dia = key_dia
-
         label_base_scale = 0.91 #Increasing this constant pulls numbers at the start of the spiral IN
         label_falloff = 0.07 / (len(points) / 5) #Increasing this constant pulls numbers towards the center of the spiral OUT
         beta = 65 * pi / 180 #Increasing this constant ROTATES all the labels CLOCKWISE in DEGREES
@@ -227,36 +417,34 @@ def allen_key_label_generator(points, distance, square_block_size, imperial = Fa
 
         i += 1
 
-        if type(label_dia) is tuple:
-            whole = label_dia[0]
-            if whole == 0:
-                whole = ""
-            else:
-                whole = str(whole)
-
-            nom = str(label_dia[1])
-            denom = str(label_dia[2])
-            
-            return cq.Workplane("XY")\
-                .frac_text(whole, nom, denom, 10, 2.0, font="Ubuntu", combine="a", halign='left')\
-                .val()\
-                .translate((p[0], p[1], p[2]))
-        else:
-            return cq.Workplane("XY")\
-                .text(str(label_dia), 6 - 0.2 * (len(str(label_dia)) - 1), 2.0, font="Ubuntu", combine="a", halign='left')\
-                .val()\
-                .translate((p[0], p[1], p[2]))
+        return extrude_outline(allen_key_label(key_dia, imperial), 2.0).translate((p[0], p[1], p[2]))
 
     return inner
 
-def allen_key_holder(widths, square_block_size, depth, imperial = False):
+def allen_key_labeler(labels):
+    """Create a label function for use with eachpoint that places one of a
+    list of laid out labels at each point, in order."""
+
+    labels = iter(labels)
+
+    return lambda loc: extrude_outline(next(labels), 2.0).moved(loc)
+
+def allen_key_holder(widths, square_block_size, depth, imperial = False, layout = "spiral"):
     """Generate a holder for allen keys that can hold one of each listed width
     and is a given number of Gridfinity units big and deep.
     
     The imperial flag does two things:
     
      * It converts inches to millimeters
-     * It prints nice-looking binary fractions for the labels"""
+     * It prints nice-looking binary fractions for the labels
+
+    Set `layout="packed"` to pack the holes as tightly as possible around the
+    middle of the block, each with its label to its right, instead of using
+    the hand-tuned spiral.
+
+    Pass `"auto"` as the block size to use the smallest block the keys fit in,
+    and as the depth to use the shallowest block that can take holes
+    `allen_key_hole_depth` deep."""
 
     physical_widths = widths
     if imperial:
@@ -265,67 +453,78 @@ def allen_key_holder(widths, square_block_size, depth, imperial = False):
     else:
         widths.sort(reverse = True)
         physical_widths = widths
+
+    if square_block_size == "auto":
+        square_block_size = allen_key_block_size(widths, physical_widths, imperial, layout)
+
+    if depth == "auto":
+        depth = gridfinity_layout.smallest_depth(allen_key_hole_depth)
     
-    distance = optimal_point_distance(physical_widths)
+    if layout == "packed":
+        placements, label_placements, labels = packed_allen_key_layout(widths,
+            physical_widths, square_block_size, imperial)
+    else:
+        distance = optimal_point_distance(physical_widths)
+        placements = allen_key_placements(physical_widths, distance)
 
-    return cq.Workplane("XY")\
+        check_allen_key_placements(widths, physical_widths, placements, square_block_size)
+
+    block = cq.Workplane("XY")\
         .gridfinity_block(square_block_size, square_block_size, depth)\
         .gridfinity_block_stack(square_block_size, square_block_size)\
         .gridfinity_block_lip(square_block_size, square_block_size)\
         .faces(cq.NearestToPointSelector((0, 0, gridfinity.block_top_surface(depth))))\
         .workplane()\
-        .polygon(len(physical_widths), distance, forConstruction=True)\
-        .vertices()\
-        .cutEach(allen_key_cutout_generator(physical_widths, depth, distance))\
+        .pushPoints(placements)\
+        .cutEach(allen_key_cutout_generator(physical_widths, depth), clean=gridfinity.clean_enabled())\
         .faces(cq.NearestToPointSelector((0, 0, gridfinity.block_top_surface(depth))))\
         .wires(cq.selectors.InverseSelector(cq.NearestToPointSelector((0, 0, 0))))\
         .fillet(fillet_radius)\
         .faces(cq.NearestToPointSelector((0, 0, gridfinity.block_top_surface(depth))))\
-        .workplane()\
+        .workplane()
+
+    if layout == "packed":
+        return block\
+            .pushPoints(label_placements)\
+            .eachpoint(allen_key_labeler(labels), combine="a", clean=gridfinity.clean_enabled())\
+            .gridfinity_clean()
+
+    return block\
         .polygon(len(widths), distance, forConstruction=True)\
         .vertices()\
-        .eachpoint(allen_key_label_generator(widths, distance, square_block_size, imperial=imperial), combine="a")
+        .eachpoint(allen_key_label_generator(widths, distance, square_block_size, imperial=imperial),
+            combine="a", clean=gridfinity.clean_enabled())\
+        .gridfinity_clean()
 
 # Ender 3 ships with an Allen Key set with the following across-flat key sizes:
 # 4mm, 3mm, 2.5mm, 2mm, and 1.5mm
 # The other sets are all various tool sets I found on Amazon; pick one that
 # best matches your current set of keys or add one to the list.
-Ender3Set = allen_key_holder([4, 3, 2.5, 2, 1.5], 1, 3)
-AmazonBasicsMetric = allen_key_holder([10, 8, 6, 5.5, 5, 4.5, 4, 3.5, 3, 2.5, 2, 1.5, 1.27], 2, 3)
-AmazonBasicsImperial = allen_key_holder([3/8, 5/16, 1/4, 7/32, 3/16, 5/32, 9/64, 1/8, 7/64, 3/32, 5/64, 1/16, 0.05], 2, 3, imperial=True)
-EPAutoMetric = allen_key_holder([10, 8, 7, 6, 5.5, 5, 4.5, 4, 3, 2.5, 2, 1.5, 1.3, 0.9, 0.7], 2, 3)
-EPAutoImperial = allen_key_holder([3/8, 5/16, 1/4, 7/32, 3/16, 5/32, 9/64, 1/8, 7/64, 3/32, 5/64, 1/16, 0.05, 0.035, 0.028], 2, 3, imperial=True)
-CraftsmanMetric = allen_key_holder([10, 8, 7, 6, 5, 4, 3, 2.5, 2, 1.5], 2, 3)
-CraftsmanImperial = allen_key_holder([3/8, 5/16, 1/4, 7/32, 3/16, 5/32, 1/8, 3/32, 5/64, 1/16], 2, 3, imperial=True)
-LichampMetric = allen_key_holder([10, 8, 6, 5, 4, 3, 2.5, 2, 1.5], 2, 3)
-LichampImperial = allen_key_holder([3/8, 5/16, 1/4, 3/16, 5/32, 1/8, 3/32, 5/64, 1/16], 2, 3, imperial=True)
-
-asm = cq.Assembly()\
-    .add(Ender3Set, name="Ender3Set")\
-    .add(AmazonBasicsMetric, name="AmazonBasicsMetric")\
-    .add(AmazonBasicsImperial, name="AmazonBasicsImperial")\
-    .add(EPAutoMetric, name="EPAutoMetric")\
-    .add(EPAutoImperial, name="EPAutoImperial")\
-    .add(CraftsmanMetric, name="CraftsmanMetric")\
-    .add(CraftsmanImperial, name="CraftsmanImperial")\
-    .add(LichampMetric, name="LichampMetric")\
-    .add(LichampImperial, name="LichampImperial")\
-    .constrain("Ender3Set@faces@<Z", "FixedPoint", (0, 0, 0))\
-    .constrain("Ender3Set@faces@<Z", "FixedRotation", (0, 0, 0))\
-    .constrain("AmazonBasicsMetric@faces@<Z", "FixedPoint", (gridfinity.grid_unit * 3, 0, 0))\
-    .constrain("AmazonBasicsMetric@faces@<Z", "FixedRotation", (0, 0, 0))\
-    .constrain("AmazonBasicsImperial@faces@<Z", "FixedPoint", (gridfinity.grid_unit * -3, 0, 0))\
-    .constrain("AmazonBasicsImperial@faces@<Z", "FixedRotation", (0, 0, 0))\
-    .constrain("EPAutoMetric@faces@<Z", "FixedPoint", (0, gridfinity.grid_unit * 3, 0))\
-    .constrain("EPAutoMetric@faces@<Z", "FixedRotation", (0, 0, 0))\
-    .constrain("EPAutoImperial@faces@<Z", "FixedPoint", (0, gridfinity.grid_unit * -3, 0))\
-    .constrain("EPAutoImperial@faces@<Z", "FixedRotation", (0, 0, 0))\
-    .constrain("CraftsmanMetric@faces@<Z", "FixedPoint", (gridfinity.grid_unit * 3, gridfinity.grid_unit * 3, 0))\
-    .constrain("CraftsmanMetric@faces@<Z", "FixedRotation", (0, 0, 0))\
-    .constrain("CraftsmanImperial@faces@<Z", "FixedPoint", (gridfinity.grid_unit * 3, gridfinity.grid_unit * -3, 0))\
-    .constrain("CraftsmanImperial@faces@<Z", "FixedRotation", (0, 0, 0))\
-    .constrain("LichampMetric@faces@<Z", "FixedPoint", (gridfinity.grid_unit * -3, gridfinity.grid_unit * 3, 0))\
-    .constrain("LichampMetric@faces@<Z", "FixedRotation", (0, 0, 0))\
-    .constrain("LichampImperial@faces@<Z", "FixedPoint", (gridfinity.grid_unit * -3, gridfinity.grid_unit * -3, 0))\
-    .constrain("LichampImperial@faces@<Z", "FixedRotation", (0, 0, 0))\
-    .solve()
\ No newline at end of file
+# Each holder is only cleaned once, after its last cut.
+with gridfinity.deferred_clean():
+    Ender3Set = allen_key_holder([4, 3, 2.5, 2, 1.5], 1, 3)
+    AmazonBasicsMetric = allen_key_holder([10, 8, 6, 5.5, 5, 4.5, 4, 3.5, 3, 2.5, 2, 1.5, 1.27], 2, 3)
+    AmazonBasicsImperial = allen_key_holder([3/8, 5/16, 1/4, 7/32, 3/16, 5/32, 9/64, 1/8, 7/64, 3/32, 5/64, 1/16, 0.05], 2, 3, imperial=True)
+    EPAutoMetric = allen_key_holder([10, 8, 7, 6, 5.5, 5, 4.5, 4, 3, 2.5, 2, 1.5, 1.3, 0.9, 0.7], 2, 3)
+    EPAutoImperial = allen_key_holder([3/8, 5/16, 1/4, 7/32, 3/16, 5/32, 9/64, 1/8, 7/64, 3/32, 5/64, 1/16, 0.05, 0.035, 0.028], 2, 3, imperial=True)
+    CraftsmanMetric = allen_key_holder([10, 8, 7, 6, 5, 4, 3, 2.5, 2, 1.5], 2, 3)
+    CraftsmanImperial = allen_key_holder([3/8, 5/16, 1/4, 7/32, 3/16, 5/32, 1/8, 3/32, 5/64, 1/16], 2, 3, imperial=True)
+    LichampMetric = allen_key_holder([10, 8, 6, 5, 4, 3, 2.5, 2, 1.5], 2, 3)
+    LichampImperial = allen_key_holder([3/8, 5/16, 1/4, 3/16, 5/32, 1/8, 3/32, 5/64, 1/16], 2, 3, imperial=True)
+
+# Every holder is centered in a 3x3 unit cell (126mm apart) with its bottom on
+# Z=0, in reading order. This isn't quite where the old FixedPoint constraints
+# put them: those pinned the middle of each bottom face, which left some
+# holders off-center (AmazonBasicsMetric at (105, 21), EPAutoMetric at
+# (-21, 147)) and the Ender 3 set sunk 4.75mm into the floor.
+asm = gridfinity.grid_assembly({
+    "LichampMetric": LichampMetric,
+    "EPAutoMetric": EPAutoMetric,
+    "CraftsmanMetric": CraftsmanMetric,
+    "AmazonBasicsImperial": AmazonBasicsImperial,
+    "Ender3Set": Ender3Set,
+    "AmazonBasicsMetric": AmazonBasicsMetric,
+    "LichampImperial": LichampImperial,
+    "EPAutoImperial": EPAutoImperial,
+    "CraftsmanImperial": CraftsmanImperial,
+})
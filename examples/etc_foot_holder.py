@@ -128,55 +128,35 @@ etc_holder = etc_holder.cut(
 
 #IT'S FILLETING TIME!
 #I swear, fillets are the most painful thing you can do in CQ
-etc_holder = etc_holder.edges(
-    cq.NearestToPointSelector((4.5 + 5, 11, gridfinity.block_top_surface(3)))
-).fillet(1).edges(
-    cq.NearestToPointSelector((4.5 + 7, 11, gridfinity.block_top_surface(3)))
-).fillet(1).edges(
-    cq.NearestToPointSelector((4.5 + 9, 11, gridfinity.block_top_surface(3)))
-).fillet(1).edges(
-    cq.NearestToPointSelector((4.5 - 5, 11, gridfinity.block_top_surface(3)))
-).fillet(1).edges(
-    cq.NearestToPointSelector((4.5 - 9, 11, gridfinity.block_top_surface(3)))
-).fillet(1).edges(
-    cq.NearestToPointSelector((4.5, 11 - 3, gridfinity.block_top_surface(3)))
-).fillet(1).edges(
-    cq.NearestToPointSelector((4.5, 11 + 3, gridfinity.block_top_surface(3)))
-).fillet(1)
-
-etc_holder = etc_holder.edges(
-    cq.NearestToPointSelector((34, -13, gridfinity.block_top_surface(3)))
-).fillet(1)
-
-etc_holder = etc_holder.edges(
-    cq.NearestToPointSelector((27, 12.25 + 2, gridfinity.block_top_surface(3)))
-).fillet(1).edges(
-    cq.NearestToPointSelector((27, 12.25 - 2, gridfinity.block_top_surface(3)))
-).fillet(1).edges(
-    cq.NearestToPointSelector((27 + 8.5, 12.25, gridfinity.block_top_surface(3)))
-).fillet(.99).edges(
-    cq.NearestToPointSelector((27 - 8.5, 12.25, gridfinity.block_top_surface(3)))
-).fillet(.99)
-
-# The quilting foot fillets are doubly annoying because we don't even have
-# plausible coords for the top edges.
-etc_holder = etc_holder.edges(
-    cq.NearestToPointSelector((-10, 0, gridfinity.block_top_surface(3)))
-).fillet(1).edges(
-    cq.NearestToPointSelector((-20, 0, gridfinity.block_top_surface(3)))
-).fillet(1).edges(
-    cq.NearestToPointSelector((-20, 10, gridfinity.block_top_surface(3)))
-).fillet(1).edges(
-    cq.NearestToPointSelector((-25, 10, gridfinity.block_top_surface(3)))
-).fillet(.99) #For some reason, this fillet breaks.
-
-etc_holder = etc_holder.edges(
-    cq.NearestToPointSelector((-10, 0, gridfinity.block_top_surface(1)))
-).fillet(2).edges(
-    cq.NearestToPointSelector((-25, -5, gridfinity.block_top_surface(1)))
-).fillet(2).edges(
-    cq.NearestToPointSelector((-19, 15, gridfinity.block_top_surface(1)))
-).fillet(2)
+rim = gridfinity.block_top_surface(3)
+floor = gridfinity.block_top_surface(1)
+
+etc_holder = etc_holder.gridfinity_fillets([
+    # Buttonhole foot
+    ((4.5 + 5, 11, rim), 1),
+    ((4.5 + 7, 11, rim), 1),
+    ((4.5 + 9, 11, rim), 1),
+    ((4.5 - 5, 11, rim), 1),
+    ((4.5 - 9, 11, rim), 1),
+    ((4.5, 11 - 3, rim), 1),
+    ((4.5, 11 + 3, rim), 1),
+    # Quilting hook rod
+    ((34, -13, rim), 1),
+    # Metal slab
+    ((27, 12.25 + 2, rim), 1),
+    ((27, 12.25 - 2, rim), 1),
+    ((27 + 8.5, 12.25, rim), .99),
+    ((27 - 8.5, 12.25, rim), .99),
+    # The quilting foot fillets are doubly annoying because we don't even
+    # have plausible coords for the top edges.
+    ((-10, 0, rim), 1),
+    ((-20, 0, rim), 1),
+    ((-20, 10, rim), 1),
+    ((-30, 7, rim), .99), #For some reason, this fillet breaks.
+    ((-10, 0, floor), 2),
+    ((-25, -5, floor), 2),
+    ((-19, 15, floor), 2),
+])
 
 del buttonhole_foot
 del quilting_hook_rod
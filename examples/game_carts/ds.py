@@ -54,11 +54,6 @@ threeds_cart = cq.Workplane("XZ")\
     .placeSketch(threeds_pins_profile)\
     .cutBlind(ds_cart_depth - ds_pcb_depth)
 
-ds_cart_holder = cq.Workplane("XY")\
-    .gridfinity_block(1, 1, 4)\
-    .gridfinity_block_stack(1, 1)\
-    .gridfinity_block_lip(1, 1)
-
 rows = 1
 cols = 3
 
@@ -79,7 +74,12 @@ pick_cutout = cq.Workplane("XZ")\
     .extrude(row_spacing * 2)\
     .translate([0, ds_cart_depth / -2, ds_cart_height / 2 + pick_cutout_lip])
 
-illustration = cq.Workplane("XY")
+# The illustration places the same cart in every slot instead of unioning
+# copies of it, so exporters can keep it as one shared, instanced part.
+illustration = cq.Assembly(name="ds_illustration")
+
+# Every slot is collected here and cut out of the holder in one go.
+cutters = []
 
 for r in range(0, rows):
     r_ctrd = r - rows / 2
@@ -95,7 +95,7 @@ for r in range(0, rows):
                 depth_base + c * depth_offset
              ])
         
-        ds_cart_holder = ds_cart_holder.cut(positioned_cart)
+        cutters.append(positioned_cart)
         
         x = r_ctrd * (ds_cart_width + row_spacing) + ds_cart_width / 2 + row_spacing / 2
         y = c_ctrd * (ds_cart_depth + depth_tolerance + col_spacing) + (ds_cart_depth + depth_tolerance) / 2 + col_spacing / 2 + row_offset
@@ -142,9 +142,20 @@ for r in range(0, rows):
         
         positioned_triangle = positioned_triangle.cut(lip)
         
-        ds_cart_holder = ds_cart_holder.cut(positioned_triangle)
+        cutters.append(positioned_triangle)
         
-        illustration = illustration.union(positioned_cart)
+        illustration.add(threeds_cart,
+            name=f"cart_{r}_{c}",
+            loc=cq.Location(cq.Vector(x, y, z), cq.Vector(-1, 0, 0), angle))
+
+# The holder is only cleaned once, after every slot has been cut.
+with gridfinity.deferred_clean():
+    ds_cart_holder = cq.Workplane("XY")\
+        .gridfinity_block(1, 1, 4)\
+        .gridfinity_block_stack(1, 1)\
+        .gridfinity_block_lip(1, 1)\
+        .gridfinity_cut_many(cutters)\
+        .gridfinity_clean()
 
 test_jig = cq.Workplane("XY")\
     .rect(ds_cart_width + tolerance + 2, ds_cart_depth + depth_tolerance + 2)\
@@ -152,6 +163,7 @@ test_jig = cq.Workplane("XY")\
     .translate([0, 0, -2])\
     .cut(threeds_cart.translate([0, (ds_cart_depth) / 2 + depth_tolerance, ds_cart_height / 2]))
 
+del cutters
 del pick_cutout
 del positioned_cart
 del lip
@@ -136,11 +136,6 @@ union_cart = cq.Workplane("YZ")\
     .translate([-gb_cart_depth, 0, (gb_chamfer_length + tolerance) / -2 + (gba_cart_height + tolerance) / 2])\
     .rotate([0, 0, 0], [0, 0, 1], 270)
 
-gb_cart_holder = cq.Workplane("XY")\
-    .gridfinity_block(3, 1, 4)\
-    .gridfinity_block_stack(3, 1)\
-    .gridfinity_block_lip(3, 1)
-
 rows = 2
 cols = 2
 
@@ -161,7 +156,12 @@ pick_cutout = cq.Workplane("XZ")\
     .extrude(row_spacing * 2)\
     .translate([0, gb_cart_depth / -2, gb_cart_height / 2 + pick_cutout_lip])
 
-illustration = cq.Workplane("XY")
+# The illustration places the same cart in every slot instead of unioning
+# copies of it, so exporters can keep it as one shared, instanced part.
+illustration = cq.Assembly(name="gb_illustration")
+
+# Every slot is collected here and cut out of the holder in one go.
+cutters = []
 
 for r in range(0, rows):
     r_ctrd = r - rows / 2
@@ -177,7 +177,7 @@ for r in range(0, rows):
                 depth_base + c * depth_offset
              ])
         
-        gb_cart_holder = gb_cart_holder.cut(positioned_cart)
+        cutters.append(positioned_cart)
         
         x = r_ctrd * (gb_cart_width + row_spacing) + gb_cart_width / 2 + row_spacing / 2
         y = c_ctrd * (gb_cart_depth + col_spacing) + gb_cart_depth / 2 + col_spacing / 2 + row_offset
@@ -223,26 +223,20 @@ for r in range(0, rows):
         
         positioned_triangle = positioned_triangle.cut(lip)
         
-        gb_cart_holder = gb_cart_holder.cut(positioned_triangle)
+        cutters.append(positioned_triangle)
         
-        if c != 0:
-            illustration = illustration.union(gb_cart\
-                .rotate([0, 0, 0], [-1, 0, 0], angle)\
-                .translate([
-                    r_ctrd * (gb_cart_width + row_spacing) + gb_cart_width / 2 + row_spacing / 2,
-                    c_ctrd * (gb_cart_depth + col_spacing) + gb_cart_depth / 2 + col_spacing / 2 + row_offset,
-                    depth_base + c * depth_offset
-                ])
-            )
-        else:
-            illustration = illustration.union(gba_cart\
-                .rotate([0, 0, 0], [-1, 0, 0], angle)\
-                .translate([
-                    r_ctrd * (gb_cart_width + row_spacing) + gb_cart_width / 2 + row_spacing / 2,
-                    c_ctrd * (gb_cart_depth + col_spacing) + gb_cart_depth / 2 + col_spacing / 2 + row_offset,
-                    depth_base + c * depth_offset
-                ])
-            )
+        illustration.add(gb_cart if c != 0 else gba_cart,
+            name=f"cart_{r}_{c}",
+            loc=cq.Location(cq.Vector(x, y, z), cq.Vector(-1, 0, 0), angle))
+
+# The holder is only cleaned once, after every slot has been cut.
+with gridfinity.deferred_clean():
+    gb_cart_holder = cq.Workplane("XY")\
+        .gridfinity_block(3, 1, 4)\
+        .gridfinity_block_stack(3, 1)\
+        .gridfinity_block_lip(3, 1)\
+        .gridfinity_cut_many(cutters)\
+        .gridfinity_clean()
 
 test_jig = cq.Workplane("XY")\
     .rect(gb_cart_width + tolerance + 2, gb_cart_depth + tolerance + 2)\
@@ -253,6 +247,7 @@ test_jig = cq.Workplane("XY")\
 del gb_cart
 del gba_cart
 del union_cart
+del cutters
 del pick_cutout
 del positioned_cart
 del positioned_triangle
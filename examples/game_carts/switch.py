@@ -1,12 +1,7 @@
-from cadquery import cq
+import cadquery as cq
 import gridfinity
 import math
 
-switch_cart_holder = cq.Workplane("XY")\
-    .gridfinity_block(2, 1, 4)\
-    .gridfinity_block_stack(2, 1)\
-    .gridfinity_block_lip(2, 1)
-
 tolerance = 0.65 #used to loosen fit with actual Switch carts
 depth_tolerance = 0.35 #loosen fit but less proportionally
 switch_cart_width = 21.38 + tolerance
@@ -72,7 +67,12 @@ pick_cutout = cq.Workplane("XZ")\
     .extrude(row_spacing * 2)\
     .translate([0, switch_cart_depth / -2, switch_cart_height / 2 + pick_cutout_lip])
 
-illustration = cq.Workplane("XY")
+# The illustration places the same cart in every slot instead of unioning
+# copies of it, so exporters can keep it as one shared, instanced part.
+illustration = cq.Assembly(name="switch_illustration")
+
+# Every slot is collected here and cut out of the holder in one go.
+cutters = []
 
 for r in range(0, rows):
     for c in range(0, cols):
@@ -87,7 +87,7 @@ for r in range(0, rows):
                 depth_base + c * depth_offset
              ])
         
-        switch_cart_holder = switch_cart_holder.cut(positioned_cart)
+        cutters.append(positioned_cart)
         
         x = r_ctrd * (switch_cart_width + row_spacing) + switch_cart_width / 2 + row_spacing / 2
         y = c_ctrd * (switch_cart_depth + col_spacing) + switch_cart_depth / 2 + col_spacing / 2 + row_offset
@@ -133,9 +133,20 @@ for r in range(0, rows):
         
         positioned_triangle = positioned_triangle.cut(lip)
         
-        switch_cart_holder = switch_cart_holder.cut(positioned_triangle)
+        cutters.append(positioned_triangle)
         
-        illustration = illustration.union(positioned_cart)
+        illustration.add(switch_cart,
+            name=f"cart_{r}_{c}",
+            loc=cq.Location(cq.Vector(x, y, z), cq.Vector(-1, 0, 0), angle))
+
+# The holder is only cleaned once, after every slot has been cut.
+with gridfinity.deferred_clean():
+    switch_cart_holder = cq.Workplane("XY")\
+        .gridfinity_block(2, 1, 4)\
+        .gridfinity_block_stack(2, 1)\
+        .gridfinity_block_lip(2, 1)\
+        .gridfinity_cut_many(cutters)\
+        .gridfinity_clean()
 
 test_jig = cq.Workplane("XY")\
     .rect(switch_cart_width + 2, switch_cart_depth + 2)\
@@ -145,6 +156,7 @@ test_jig = cq.Workplane("XY")\
 
 del switch_cart
 del switch_cart_pin
+del cutters
 del pick_cutout
 del positioned_cart
 del positioned_triangle
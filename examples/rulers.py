@@ -47,10 +47,7 @@ staedtler_ruler = cq.Workplane("XY")\
     .gridfinity_block(1, 1, 6)\
     .gridfinity_block_stack(1, 1)\
     .gridfinity_block_lip(1, 1)\
-    .gridfinity_top_face(6)\
-    .workplane()\
-    .placeSketch(staedtler_profile.moved(cq.Location(cq.Vector((3,0,0)))))\
-    .cutBlind(gridfinity.block_cut_limit(6) * -1)\
+    .gridfinity_cut_pockets(6, staedtler_profile.moved(cq.Location(cq.Vector((3,0,0)))))\
     .wires(cq.NearestToPointSelector((staedtler_profile_height / 6, 0, gridfinity.block_top_surface(6))))\
     .fillet(1.5)\
     .wires(cq.NearestToPointSelector((staedtler_profile_height / 6, 0, gridfinity.block_top_surface(6) - gridfinity.block_cut_limit(6))))\
@@ -114,20 +111,17 @@ china_profile = cq.Sketch()\
     .fillet(3)\
     .reset()
 
+# Two rulers go in one block, back to back, cut in one go.
+china_pockets = gridfinity.pocket_sketch([
+    (china_profile, cq.Location(cq.Vector(-2, 2, 0), cq.Vector(0, 0, 1), 45)),
+    (china_profile, cq.Location(cq.Vector(2, -2, 0), cq.Vector(0, 0, 1), -135)),
+])
+
 china_ruler = cq.Workplane("XY")\
     .gridfinity_block(1, 1, 6)\
     .gridfinity_block_stack(1, 1)\
     .gridfinity_block_lip(1, 1)\
-    .gridfinity_top_face(6)\
-    .workplane()\
-    .transformed(offset=(-2, 2, 0), rotate=(0, 0, 45))\
-    .placeSketch(china_profile.moved(cq.Location(cq.Vector((0,0,0)))))\
-    .cutBlind(gridfinity.block_cut_limit(6) * -1)\
-    .transformed(rotate=(0, 0, -45))\
-    .transformed(offset=(2, -2, 0))\
-    .transformed(offset=(2, -2, 0), rotate=(0, 0, -135))\
-    .placeSketch(china_profile.moved(cq.Location(cq.Vector((0,0,0)))))\
-    .cutBlind(gridfinity.block_cut_limit(6) * -1)\
+    .gridfinity_cut_pockets(6, china_pockets)\
     .edges(cq.NearestToPointSelector((5,0,gridfinity.block_top_surface(6))))\
     .fillet(1.5)\
     .edges(cq.NearestToPointSelector((-5,0,gridfinity.block_top_surface(6))))\
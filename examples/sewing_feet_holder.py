@@ -31,95 +31,94 @@ SPACING_Y = 6
 
 SLOT_FILLET = 1
 
-for i in range(0, 3):
-    for j in range(0, 2):
-        if i == 0 and j == 1:
-            FOOT_WIDTH = N_FOOT_WIDTH + 0.5
-        elif i == 1 and j == 0:
-            FOOT_WIDTH = X_FOOT_WIDTH + 0.5
-        elif i == 1 and j == 1:
-            FOOT_WIDTH = I_FOOT_WIDTH_TAB + 0.5
-        elif i == 2:
-            FOOT_WIDTH = R_FOOT_WIDTH + 0.5
-        else:
-            FOOT_WIDTH = M_FOOT_WIDTH + 0.5
-        
-        z_coord = 3 * j
-        
-        sewing_foot = cq.Workplane("XY")\
-            .rect(FOOT_WIDTH, FOOT_THICKNESS)\
-            .extrude(FOOT_WIDTH * 2)\
-            .translate([0, 0, 2])
-        
-        x_coord = (M_FOOT_WIDTH + SPACING_X) * (i - 1)
-        y_coord = (FOOT_THICKNESS + SPACING_Y) * (j - 0.5)
-
-        if i == 0 and j == 1: #N foot compartment
-            x_coord -= (M_FOOT_WIDTH - FOOT_WIDTH) / 2
-
-        sewing_foot_block = sewing_foot_block.cut(
-            sewing_foot.translate(
-                [x_coord,
-                y_coord,
-                z_coord]
-            )
-        ).edges(
-            cq.NearestToPointSelector((x_coord + 8,
-                                    y_coord,
-                                    gridfinity.block_top_surface(3)))
-        ).fillet(SLOT_FILLET)\
-        .edges(
-            cq.NearestToPointSelector((x_coord - 8,
-                                    y_coord,
-                                    gridfinity.block_top_surface(3)))
-        ).fillet(SLOT_FILLET)\
-        .edges(
-            cq.NearestToPointSelector((x_coord,
-                                    y_coord + 4,
-                                    gridfinity.block_top_surface(3)))
-        ).fillet(SLOT_FILLET)\
-        .edges(
-            cq.NearestToPointSelector((x_coord,
-                                    y_coord - 4,
-                                    gridfinity.block_top_surface(3)))
-        ).fillet(SLOT_FILLET)\
-        .edges(
-            cq.NearestToPointSelector((x_coord,
-                                    y_coord + 0.5,
-                                    3 * j))
-        ).fillet(FOOT_THICKNESS - SLOT_FILLET)
-
-        if i == 2 and j == 0:
-            #The R foot's metal fin is near enough to the center that
-            #I don't feel like doing the parametric math to properly
-            #offset it.
-            cutout_block = cq.Workplane("XY")\
-                .rect(R_FOOT_FIN_CUTOUT_WIDTH, FOOT_THICKNESS + 2.5)\
-                .extrude(FOOT_WIDTH * 2)\
-                .translate([x_coord, y_coord - 1.25, 0])
-            
-            sewing_foot_block = sewing_foot_block.cut(cutout_block)\
-                .edges(
-                    cq.NearestToPointSelector((x_coord + 1, y_coord - 6, gridfinity.block_top_surface(3)))                    
-                )\
-                .fillet(SLOT_FILLET)\
-                .edges(
-                    cq.NearestToPointSelector((x_coord - 1, y_coord - 6, gridfinity.block_top_surface(3)))                    
-                )\
-                .fillet(SLOT_FILLET)\
-                .edges(
-                    cq.NearestToPointSelector((x_coord, y_coord - 7, gridfinity.block_top_surface(3)))                    
-                )\
-                .fillet(SLOT_FILLET)
-        
-        if i == 2 and j == 1:
-            #The G foot is only half-curved at the front.
-            cutout_block = cq.Workplane("XY")\
-                .rect(G_FOOT_FIN_CUTOUT_WIDTH, FOOT_THICKNESS)\
-                .extrude(FOOT_WIDTH * 2)\
-                .translate([x_coord + FOOT_WIDTH / 2 - G_FOOT_FIN_CUTOUT_WIDTH / 2, y_coord, 1.75])
-            
-            sewing_foot_block = sewing_foot_block.cut(cutout_block)
-
-del cutout_block
-del sewing_foot
\ No newline at end of file
+def foot_slot(i, j):
+    """Work out the width of the slot for the foot in column i, row j, and
+    where it goes."""
+    if i == 0 and j == 1:
+        foot_width = N_FOOT_WIDTH + 0.5
+    elif i == 1 and j == 0:
+        foot_width = X_FOOT_WIDTH + 0.5
+    elif i == 1 and j == 1:
+        foot_width = I_FOOT_WIDTH_TAB + 0.5
+    elif i == 2:
+        foot_width = R_FOOT_WIDTH + 0.5
+    else:
+        foot_width = M_FOOT_WIDTH + 0.5
+
+    x_coord = (M_FOOT_WIDTH + SPACING_X) * (i - 1)
+    y_coord = (FOOT_THICKNESS + SPACING_Y) * (j - 0.5)
+
+    if i == 0 and j == 1: #N foot compartment
+        x_coord -= (M_FOOT_WIDTH - foot_width) / 2
+
+    return foot_width, x_coord, y_coord
+
+slots = {(i, j): foot_slot(i, j) for i in range(0, 3) for j in range(0, 2)}
+
+def slot_outlines(slots):
+    return gridfinity.pocket_sketch([
+        (cq.Sketch().rect(foot_width, FOOT_THICKNESS), cq.Location(cq.Vector(x_coord, y_coord, 0)))
+        for foot_width, x_coord, y_coord in slots])
+
+# Each row of slots is cut in one go. The back row sits 3mm higher.
+for j in range(0, 2):
+    sewing_foot_block = sewing_foot_block.gridfinity_cut_pockets(3,
+        slot_outlines([slot for (_, row), slot in slots.items() if row == j]),
+        gridfinity.block_top_surface(3) - 2 - 3 * j)
+
+for (i, j), (foot_width, x_coord, y_coord) in slots.items():
+    sewing_foot_block = sewing_foot_block.edges(
+        cq.NearestToPointSelector((x_coord + 8,
+                                y_coord,
+                                gridfinity.block_top_surface(3)))
+    ).fillet(SLOT_FILLET)\
+    .edges(
+        cq.NearestToPointSelector((x_coord - 8,
+                                y_coord,
+                                gridfinity.block_top_surface(3)))
+    ).fillet(SLOT_FILLET)\
+    .edges(
+        cq.NearestToPointSelector((x_coord,
+                                y_coord + 4,
+                                gridfinity.block_top_surface(3)))
+    ).fillet(SLOT_FILLET)\
+    .edges(
+        cq.NearestToPointSelector((x_coord,
+                                y_coord - 4,
+                                gridfinity.block_top_surface(3)))
+    ).fillet(SLOT_FILLET)\
+    .edges(
+        cq.NearestToPointSelector((x_coord,
+                                y_coord + 0.5,
+                                3 * j))
+    ).fillet(FOOT_THICKNESS - SLOT_FILLET)
+
+foot_width, x_coord, y_coord = slots[2, 0]
+
+#The R foot's metal fin is near enough to the center that
+#I don't feel like doing the parametric math to properly
+#offset it.
+sewing_foot_block = sewing_foot_block.gridfinity_cut_pockets(3,
+        cq.Sketch().push([(x_coord, y_coord - 1.25)]).rect(R_FOOT_FIN_CUTOUT_WIDTH, FOOT_THICKNESS + 2.5),
+        gridfinity.block_top_surface(3))\
+    .edges(
+        cq.NearestToPointSelector((x_coord + 1, y_coord - 6, gridfinity.block_top_surface(3)))
+    )\
+    .fillet(SLOT_FILLET)\
+    .edges(
+        cq.NearestToPointSelector((x_coord - 1, y_coord - 6, gridfinity.block_top_surface(3)))
+    )\
+    .fillet(SLOT_FILLET)\
+    .edges(
+        cq.NearestToPointSelector((x_coord, y_coord - 7, gridfinity.block_top_surface(3)))
+    )\
+    .fillet(SLOT_FILLET)
+
+foot_width, x_coord, y_coord = slots[2, 1]
+
+#The G foot is only half-curved at the front.
+sewing_foot_block = sewing_foot_block.gridfinity_cut_pockets(3,
+    cq.Sketch().push([(x_coord + foot_width / 2 - G_FOOT_FIN_CUTOUT_WIDTH / 2, y_coord)]).rect(G_FOOT_FIN_CUTOUT_WIDTH, FOOT_THICKNESS),
+    gridfinity.block_top_surface(3) - 1.75)
+
+del slots
@@ -1,27 +1,44 @@
 import cadquery as cq
-import gridfinity, math
+import gridfinity, gridfinity_layout, math
 
 FUDGE_FACTOR = 0.25
 
-def cut_at(tube, block, point):
-    return block\
-            .cut(tube.translate(point))\
-            .edges(
-                cq.NearestToPointSelector((point[0], point[1], gridfinity.block_top_surface(1)))
-            )\
-            .fillet(2)\
-            .edges(
-                cq.NearestToPointSelector((point[0], point[1], gridfinity.block_top_surface(3)))
-            )\
-            .fillet(1)
+# Radius of the fillet around the rim of each tube hole.
+RIM_FILLET = 1
 
-def tube_holder(dia):
-    size = 1
-    if dia > 35:
-        size = 2
-    
-    if dia > 77:
-        size = 3
+def tube_fillets(points):
+    """List the fillets that round off the top and bottom edges of tube holes
+    cut at the given points."""
+    return [request for point in points for request in (
+        ((point[0], point[1], gridfinity.block_top_surface(1)), 2),
+        ((point[0], point[1], gridfinity.block_top_surface(3)), RIM_FILLET))]
+
+def tube_holder(dia, layout="quincunx", size=None, count=None):
+    """Generate a holder for tubes of a given diameter.
+
+    Set `layout="hex"` to fit as many tubes as possible on a hexagonal grid,
+    instead of the fixed quincunx/pair/single layouts. `count` limits how
+    many holes the hex layout gets.
+
+    Set `size="auto"` to use the smallest block that fits `count` tubes (one
+    by default) on a hexagonal grid, rather than picking the block size from
+    the tube diameter."""
+    radius = (dia + FUDGE_FACTOR) / 2 + RIM_FILLET
+
+    if size == "auto":
+        layout = "hex"
+        count = count or 1
+
+        size, _, _ = gridfinity_layout.smallest_block(
+            lambda w, h: len(gridfinity_layout.hex_layout(radius, w, h, clearance=1)) >= count,
+            square=True)
+    elif size is None:
+        size = 1
+        if dia > 35:
+            size = 2
+        
+        if dia > 77:
+            size = 3
     
     size_mm = size * gridfinity.grid_unit
 
@@ -35,32 +52,35 @@ def tube_holder(dia):
         .gridfinity_block_stack(size,size)\
         .gridfinity_block_lip(size,size)
     
-    if dia <= 12:
+    if layout == "hex":
+        points = [(x, y, 0) for x, y in gridfinity_layout.hex_layout(radius, size, size, clearance=1)]
+
+        if count is not None:
+            points = sorted(points, key=lambda p: math.hypot(p[0], p[1]))[:count]
+
+        # Tubes too big for the top surface still get one hole, like the
+        # quincunx layout gives them.
+        if len(points) == 0:
+            points = [(0, 0, 0)]
+    elif dia <= 12:
         quincunx_dist = size_mm / 4
 
-        block = cut_at(tube, block, (0, 0, 0))
-        block = cut_at(tube, block, (quincunx_dist, quincunx_dist, 0))
-        block = cut_at(tube, block, (-quincunx_dist, -quincunx_dist, 0))
-        block = cut_at(tube, block, (-quincunx_dist, quincunx_dist, 0))
-        block = cut_at(tube, block, (quincunx_dist, -quincunx_dist, 0))
+        points = [(0, 0, 0),
+                  (quincunx_dist, quincunx_dist, 0),
+                  (-quincunx_dist, -quincunx_dist, 0),
+                  (-quincunx_dist, quincunx_dist, 0),
+                  (quincunx_dist, -quincunx_dist, 0)]
     elif (size_mm - gridfinity.block_mating_inset) > dia * 2:
         quincunx_dist = size_mm / 5.5
 
-        block = cut_at(tube, block, (quincunx_dist, quincunx_dist, 0))
-        block = cut_at(tube, block, (-quincunx_dist, -quincunx_dist, 0))
+        points = [(quincunx_dist, quincunx_dist, 0),
+                  (-quincunx_dist, -quincunx_dist, 0)]
     else:
-        block = block\
-            .cut(tube)\
-            .edges(
-                cq.NearestToPointSelector((0, 0, gridfinity.block_top_surface(1)))
-            )\
-            .fillet(2)\
-            .edges(
-                cq.NearestToPointSelector((0, 0, gridfinity.block_top_surface(3)))
-            )\
-            .fillet(1)
+        points = [(0, 0, 0)]
     
-    return block
+    return block\
+        .gridfinity_cut_many([tube.translate(point) for point in points])\
+        .gridfinity_fillets(tube_fillets(points))
 
 for i in range(5, 78):
     interval = 1.5
@@ -30,14 +30,12 @@ walking_foot = cq.Workplane("XY")\
     .edges("<Y")\
     .fillet(1)
 
+rim = gridfinity.block_top_surface(3)
+
 walking_foot_block = walking_foot_block.cut(walking_foot)\
-    .edges(cq.NearestToPointSelector([4,0,gridfinity.block_top_surface(3)]))\
-    .fillet(1)\
-    .edges(cq.NearestToPointSelector([0,4,gridfinity.block_top_surface(3)]))\
-    .fillet(1)\
-    .edges(cq.NearestToPointSelector([-4,0,gridfinity.block_top_surface(3)]))\
-    .fillet(1)\
-    .edges(cq.NearestToPointSelector([0,-4,gridfinity.block_top_surface(3)]))\
-    .fillet(1)
+    .gridfinity_fillets([((4, 0, rim), 1),
+                         ((0, 4, rim), 1),
+                         ((-4, 0, rim), 1),
+                         ((0, -4, rim), 1)])
 
 del walking_foot
\ No newline at end of file
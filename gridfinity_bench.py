@@ -0,0 +1,339 @@
+"""Benchmarks for the core Gridfinity plugins.
+
+Times `gridfinity_block`, `gridfinity_block_stack` and `gridfinity_block_lip`
+over a matrix of block sizes, and records the face/edge count of each result
+and the peak memory use of the process that built it:
+
+    python -m gridfinity_bench run -o baseline.json
+    python -m gridfinity_bench run --compare baseline.json
+
+The `clean` command builds model scripts with and without `deferred_clean`
+and compares the two:
+
+    python -m gridfinity_bench clean
+
+The `sweep` command checks that the swept stacking lip builds and matches the
+classic one on every block size:
+
+    python -m gridfinity_bench sweep
+
+Every block is built in a fresh worker process so that peak RSS is measured
+per block, and the geometry cache is disabled so that every plugin actually
+runs."""
+
+import argparse, json, os, resource, runpy, sys, time
+from concurrent.futures import ProcessPoolExecutor
+
+repo_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Relative slowdown past which a benchmark counts as a regression.
+default_threshold = 0.25
+
+# Slowdowns smaller than this many seconds are treated as noise.
+default_noise_floor = 0.05
+
+def parse_range(text):
+    """Parse a list of integers like `1-8` or `1,2,4`."""
+
+    values = []
+
+    for part in text.split(","):
+        if "-" in part:
+            start, end = part.split("-")
+            values.extend(range(int(start), int(end) + 1))
+        else:
+            values.append(int(part))
+
+    return values
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process in megabytes."""
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes, macOS reports bytes.
+    if sys.platform == "darwin":
+        return rss / (1024 * 1024)
+
+    return rss / 1024
+
+def case_name(plugin, width, height, depth):
+    return f"{plugin}[{width}x{height}x{depth}]"
+
+def measure(plugin, width, height, depth, fn):
+    """Run one plugin call and describe its result."""
+
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+
+    solid = result.findSolid()
+
+    return result, (case_name(plugin, width, height, depth), {
+        "time": elapsed,
+        "faces": len(solid.Faces()),
+        "edges": len(solid.Edges()),
+    })
+
+def bench_block(width, height, depth):
+    """Build a complete block and time each plugin in the chain.
+
+    This is what runs in each worker process."""
+
+    sys.path.insert(0, repo_dir)
+
+    import cadquery as cq
+    import gridfinity, gridfinity_cache
+
+    gridfinity_cache.configure(None)
+
+    results = {}
+
+    block, (name, stats) = measure("gridfinity_block", width, height, depth,
+        lambda: cq.Workplane("XY").gridfinity_block(width, height, depth))
+    results[name] = stats
+
+    block, (name, stats) = measure("gridfinity_block_stack", width, height, depth,
+        lambda: block.gridfinity_block_stack(width, height))
+    results[name] = stats
+
+    block, (name, stats) = measure("gridfinity_block_lip", width, height, depth,
+        lambda: block.gridfinity_block_lip(width, height))
+    results[name] = stats
+
+    rss = peak_rss_mb()
+
+    for stats in results.values():
+        stats["peak_rss_mb"] = rss
+
+    return results
+
+def run_matrix(widths, heights, depths, jobs=1, square=False, progress=sys.stderr):
+    """Benchmark every combination of block sizes.
+
+    Running more than one job at a time is faster, but the timings will be
+    noisier."""
+
+    sizes = [(w, h, d) for w in widths for h in heights for d in depths
+             if not square or w == h]
+
+    results = {}
+
+    with ProcessPoolExecutor(max_workers=jobs, max_tasks_per_child=1) as pool:
+        futures = [(size, pool.submit(bench_block, *size)) for size in sizes]
+
+        for (width, height, depth), future in futures:
+            results.update(future.result())
+
+            if progress is not None:
+                print(f"{width}x{height}x{depth} done", file=progress)
+
+    return results
+
+def compare(baseline, results, threshold=default_threshold, noise_floor=default_noise_floor):
+    """Compare benchmark results against a baseline.
+
+    Returns a list of (case, old time, new time) for every regression, and a
+    list of (case, old faces, new faces) for every case whose face count
+    changed."""
+
+    regressions = []
+    topology_changes = []
+
+    for name, new in sorted(results.items()):
+        old = baseline.get(name)
+
+        if old is None:
+            continue
+
+        if new["time"] > old["time"] * (1 + threshold) and new["time"] - old["time"] > noise_floor:
+            regressions.append((name, old["time"], new["time"]))
+
+        if new["faces"] != old["faces"]:
+            topology_changes.append((name, old["faces"], new["faces"]))
+
+    return regressions, topology_changes
+
+def print_results(results, out=sys.stdout):
+    for name, stats in sorted(results.items()):
+        print(f"{name:<36} {stats['time']:>8.3f}s {stats['faces']:>6} faces "
+              f"{stats['edges']:>6} edges {stats['peak_rss_mb']:>8.1f}MB", file=out)
+
+def run(args):
+    results = run_matrix(parse_range(args.widths), parse_range(args.heights),
+        parse_range(args.depths), jobs=args.jobs, square=args.square)
+
+    print_results(results)
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump({"version": 1, "cases": results}, f, indent=2, sort_keys=True)
+
+    if args.compare is None:
+        return 0
+
+    with open(args.compare) as f:
+        baseline = json.load(f)["cases"]
+
+    regressions, topology_changes = compare(baseline, results, args.threshold, args.noise_floor)
+
+    for name, old_faces, new_faces in topology_changes:
+        print(f"topology changed: {name}: {old_faces} -> {new_faces} faces")
+
+    for name, old_time, new_time in regressions:
+        print(f"REGRESSION: {name}: {old_time:.3f}s -> {new_time:.3f}s "
+              f"(+{(new_time / old_time - 1) * 100:.0f}%)")
+
+    return 1 if regressions else 0
+
+# Scripts that `clean` builds by default: the ones with the longest chains of
+# booleans.
+clean_scripts = [
+    "examples/ender_3_allen_keys.py",
+    "examples/game_carts/gb.py",
+    "examples/game_carts/ds.py",
+    "examples/game_carts/switch.py",
+]
+
+def bench_script(path, defer):
+    """Run a model script with or without `deferred_clean`, and describe every
+    model it builds.
+
+    This is what runs in each worker process."""
+
+    sys.path[:0] = [os.path.dirname(os.path.abspath(path)), repo_dir]
+
+    import cadquery as cq
+    import gridfinity_cache, gridfinity_cli, gridfinity_plugins
+
+    gridfinity_cache.configure(None)
+    gridfinity_plugins.defer_clean = defer
+
+    start = time.perf_counter()
+    namespace = runpy.run_path(path)
+    elapsed = time.perf_counter() - start
+
+    models = {}
+
+    for name, model in gridfinity_cli.find_models(namespace).items():
+        shape = model.toCompound() if isinstance(model, cq.Assembly) else model.findSolid()
+        models[name] = {"faces": len(shape.Faces()), "volume": shape.Volume()}
+
+    return {"time": elapsed, "peak_rss_mb": peak_rss_mb(), "models": models}
+
+def clean(args):
+    scripts = args.scripts or [os.path.join(repo_dir, s) for s in clean_scripts]
+    results = {}
+
+    with ProcessPoolExecutor(max_workers=args.jobs, max_tasks_per_child=1) as pool:
+        futures = [((script, defer), pool.submit(bench_script, script, defer))
+                   for script in scripts for defer in (False, True)]
+
+        for key, future in futures:
+            results[key] = future.result()
+
+    changed = 0
+
+    for script in scripts:
+        before, after = results[(script, False)], results[(script, True)]
+
+        print(f"{os.path.relpath(script)}: {before['time']:.2f}s -> {after['time']:.2f}s "
+              f"({before['time'] / after['time']:.2f}x)")
+
+        for name, old in sorted(before["models"].items()):
+            new = after["models"].get(name)
+
+            if new is None:
+                continue
+
+            same = abs(new["volume"] - old["volume"]) <= 1e-6 * max(abs(old["volume"]), 1)
+            changed += not same
+
+            print(f"    {name:<32} {old['faces']:>6} -> {new['faces']:>6} faces"
+                  + ("" if same else f"  VOLUME CHANGED: {old['volume']:.3f} -> {new['volume']:.3f}"))
+
+    return 1 if changed else 0
+
+def check_sweep(width, height, depth):
+    """Build a block's stacking lip both ways, and compare the two.
+
+    This is what runs in each worker process."""
+
+    import cadquery as cq
+    import gridfinity, gridfinity_cache
+
+    gridfinity_cache.configure(None)
+
+    block = cq.Workplane("XY").gridfinity_block(width, height, depth)
+    classic = block.gridfinity_block_stack(width, height).findSolid()
+
+    try:
+        swept = block.gridfinity_block_stack(width, height, sweep=True).findSolid()
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+    return {"classic": classic.Volume(), "swept": swept.Volume(),
+            "faces": len(swept.Faces()), "valid": swept.isValid()}
+
+def sweep(args):
+    cases = [(w, h) for w in parse_range(args.widths) for h in parse_range(args.heights)]
+    failed = 0
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [(case, pool.submit(check_sweep, *case, args.depth)) for case in cases]
+
+        for (width, height), future in futures:
+            result = future.result()
+            name = f"{width}x{height}"
+
+            if "error" in result:
+                failed += 1
+                print(f"{name:<8} FAILED: {result['error']}")
+                continue
+
+            same = abs(result["swept"] - result["classic"]) <= 1e-6 * result["classic"]
+            failed += not (same and result["valid"])
+
+            print(f"{name:<8} {result['faces']:>6} faces {result['swept']:>14.3f}"
+                  + ("" if same else f"  VOLUME CHANGED: classic {result['classic']:.3f}")
+                  + ("" if result["valid"] else "  INVALID"))
+
+    return 1 if failed else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="gridfinity_bench", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="benchmark the block plugins over a matrix of sizes")
+    run_parser.add_argument("--widths", default="1-8", help="block widths, e.g. 1-8 or 1,2,4")
+    run_parser.add_argument("--heights", default="1-8", help="block heights")
+    run_parser.add_argument("--depths", default="2-12", help="block depths")
+    run_parser.add_argument("--square", action="store_true", help="only benchmark square blocks")
+    run_parser.add_argument("-j", "--jobs", type=int, default=1, help="number of worker processes")
+    run_parser.add_argument("-o", "--output", help="save results as a JSON baseline")
+    run_parser.add_argument("--compare", help="baseline JSON to check for regressions against")
+    run_parser.add_argument("--threshold", type=float, default=default_threshold,
+        help="relative slowdown that counts as a regression (default: %(default)s)")
+    run_parser.add_argument("--noise-floor", type=float, default=default_noise_floor,
+        help="ignore slowdowns smaller than this many seconds (default: %(default)s)")
+    run_parser.set_defaults(func=run)
+
+    clean_parser = commands.add_parser("clean", help="compare building scripts with and without deferred_clean")
+    clean_parser.add_argument("scripts", nargs="*",
+        help="model scripts to build (default: the allen key and cart holders)")
+    clean_parser.add_argument("-j", "--jobs", type=int, default=1, help="number of worker processes")
+    clean_parser.set_defaults(func=clean)
+
+    sweep_parser = commands.add_parser("sweep", help="compare the swept stacking lip with the classic one")
+    sweep_parser.add_argument("--widths", default="1-8", help="block widths, e.g. 1-8 or 1,2,4")
+    sweep_parser.add_argument("--heights", default="1-8", help="block heights")
+    sweep_parser.add_argument("--depth", type=int, default=3, help="block depth")
+    sweep_parser.add_argument("-j", "--jobs", type=int, default=1, help="number of worker processes")
+    sweep_parser.set_defaults(func=sweep)
+
+    args = parser.parse_args(argv)
+
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+import functools, hashlib, inspect, io, os, tempfile
+
+## Persistent geometry cache for Gridfinity plugins
+##
+## Building the same base shell over and over again is slow, so plugins
+## wrapped with `cached` store their result as a BREP file and load it back
+## the next time they are called with the same inputs.
+##
+## Cache keys cover the plugin name, its arguments, the geometry it was
+## called on, every numeric constant in the plugin's module, the source of
+## that module and of every module its helper functions came from, and
+## whether the plugin is cleaning its results.
+## Changing any of those simply produces new keys; the stale entries fall
+## out of the cache as it evicts least-recently-used files.
+
+# Directory to store cached BREP files in. The cache is disabled when this is
+# None. Set the GRIDFINITY_CACHE_DIR environment variable or call `configure`
+# to turn it on.
+cache_dir = os.environ.get("GRIDFINITY_CACHE_DIR")
+
+# Maximum total size of the cache directory, in bytes.
+cache_size_limit = int(os.environ.get("GRIDFINITY_CACHE_SIZE", 512 * 1024 * 1024))
+
+# Bump this whenever the key scheme or file format changes.
+cache_version = 1
+
+_source_digests = {}
+
+def configure(directory, size_limit=None):
+    """Enable the cache in a given directory, optionally changing the size
+    limit.
+
+    Pass `directory=None` to disable the cache again."""
+    global cache_dir, cache_size_limit
+
+    cache_dir = directory
+
+    if size_limit is not None:
+        cache_size_limit = size_limit
+
+def clear():
+    """Delete every entry in the cache directory."""
+
+    for path, _ in _entries():
+        os.remove(path)
+
+def dimension_constants(namespace):
+    """Collect every public, numeric, module-level value out of a module
+    namespace.
+
+    These are the dimension constants that the cache key depends on."""
+
+    return {k: v for k, v in namespace.items()
+            if not k.startswith("_") and type(v) in (int, float)}
+
+def _module_digest(filename):
+    """Hash the source file a plugin was defined in, once per process."""
+
+    if filename not in _source_digests:
+        try:
+            with open(filename, "rb") as f:
+                _source_digests[filename] = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            _source_digests[filename] = None
+
+    return _source_digests[filename]
+
+def _source_files(plugin):
+    """List the source files a plugin depends on: its own module, plus the
+    modules of any functions it imported (e.g. from `gridfinity_dims`)."""
+
+    files = {plugin.__code__.co_filename}
+
+    for value in plugin.__globals__.values():
+        code = getattr(value, "__code__", None)
+
+        if code is not None:
+            files.add(code.co_filename)
+
+    return sorted(files)
+
+def _shape_digest(shape):
+    """Hash the serialized BREP of a shape."""
+
+    stream = io.BytesIO()
+    shape.exportBrep(stream)
+
+    return hashlib.sha256(stream.getvalue()).hexdigest()
+
+def _workplane_digest(workplane):
+    """Describe the geometry a plugin is being called on.
+
+    Workplanes returned from a cached plugin carry their own key, so chained
+    plugins never have to serialize their input."""
+
+    plane = workplane.plane
+    plane_key = (plane.origin.toTuple(), plane.xDir.toTuple(), plane.zDir.toTuple())
+
+    parent_key = getattr(workplane, "_gridfinity_cache_key", None)
+    if parent_key is not None:
+        return (parent_key, plane_key)
+
+    try:
+        solid = workplane.findSolid()
+    except ValueError:
+        return (None, plane_key)
+
+    return (_shape_digest(solid), plane_key)
+
+def _clean_enabled(plugin):
+    """Check whether a plugin cleans its result. Skipping the clean (inside
+    `deferred_clean`) leaves the same shape with different topology, so the
+    two are cached separately."""
+
+    clean_enabled = plugin.__globals__.get("clean_enabled")
+
+    return clean_enabled() if clean_enabled is not None else True
+
+def cache_key(plugin, args, kwargs, workplane):
+    """Calculate the cache key for calling a plugin on a workplane."""
+
+    bound = inspect.signature(plugin).bind(workplane, *args, **kwargs)
+    bound.apply_defaults()
+    arguments = list(bound.arguments.items())[1:]
+
+    constants = sorted(dimension_constants(plugin.__globals__).items())
+
+    key = repr((cache_version,
+                plugin.__module__,
+                plugin.__name__,
+                arguments,
+                constants,
+                [_module_digest(f) for f in _source_files(plugin)],
+                _clean_enabled(plugin),
+                _workplane_digest(workplane)))
+
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+def _path(key):
+    return os.path.join(cache_dir, key + ".brep")
+
+def _entries():
+    """List every cache entry as a (path, stat) pair."""
+
+    if cache_dir is None or not os.path.isdir(cache_dir):
+        return []
+
+    entries = []
+
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".brep"):
+            continue
+
+        path = os.path.join(cache_dir, name)
+
+        try:
+            entries.append((path, os.stat(path)))
+        except FileNotFoundError:
+            continue
+
+    return entries
+
+def load(key):
+    """Load a cached shape, or return None if it isn't in the cache.
+
+    Loading an entry marks it as recently used."""
+    import cadquery as cq
+
+    path = _path(key)
+
+    if not os.path.exists(path):
+        return None
+
+    try:
+        shape = cq.Shape.importBrep(path)
+    except Exception:
+        os.remove(path)
+        return None
+
+    os.utime(path)
+
+    return shape
+
+def store(key, shape):
+    """Store a shape in the cache, then evict entries until the cache fits
+    inside its size limit.
+
+    Files are written under a temporary name and renamed into place, so
+    several processes can safely share one cache directory."""
+
+    os.makedirs(cache_dir, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=cache_dir)
+    os.close(fd)
+
+    try:
+        shape.exportBrep(tmp_path)
+        os.replace(tmp_path, _path(key))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    evict(cache_size_limit)
+
+def evict(size_limit):
+    """Delete least-recently-used entries until the cache is no bigger than
+    the given number of bytes."""
+
+    entries = sorted(_entries(), key=lambda e: e[1].st_mtime)
+    total = sum(stat.st_size for _, stat in entries)
+
+    for path, stat in entries:
+        if total <= size_limit:
+            break
+
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+        total -= stat.st_size
+
+def cached(plugin):
+    """Wrap a Workplane plugin so that its result is stored in, and loaded
+    from, the on-disk cache.
+
+    The plugin must leave a single shape on the stack, which is what all of
+    the Gridfinity block plugins do."""
+
+    @functools.wraps(plugin)
+    def inner(self, *args, **kwargs):
+        if cache_dir is None:
+            return plugin(self, *args, **kwargs)
+
+        key = cache_key(plugin, args, kwargs, self)
+        shape = load(key)
+
+        if shape is None:
+            result = plugin(self, *args, **kwargs)
+            store(key, result.val())
+        else:
+            result = self.newObject([shape])
+
+        result._gridfinity_cache_key = key
+
+        return result
+
+    return inner
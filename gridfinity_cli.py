@@ -0,0 +1,268 @@
+"""Command line tools for building Gridfinity models.
+
+Model scripts (the examples, the magnet jig, etc.) define their models as
+module-level Workplanes and Assemblies so that CQ-editor can pick them up. The
+`build` command runs a set of those scripts in parallel worker processes and
+exports every model it finds:
+
+    python -m gridfinity_cli build examples baseplate_magnet_jig.py -o build
+
+Each script runs in its own worker, since a script has to be executed in full
+to get at any of its models.
+
+The `tile` command splits a baseplate too big for the print bed into tiles,
+and exports each distinct tile once:
+
+    python -m gridfinity_cli tile 20 12 --bed 220x220 --magnets -o tiles"""
+
+import argparse, os, re, runpy, sys, time, traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+repo_dir = os.path.dirname(os.path.abspath(__file__))
+
+export_formats = ("step", "stl")
+
+def find_models(namespace):
+    """Find every model defined in a script's namespace.
+
+    Models are Workplanes with at least one shape on the stack, and
+    Assemblies. Names starting with an underscore are skipped."""
+    import cadquery as cq
+
+    models = {}
+
+    for name, value in namespace.items():
+        if name.startswith("_"):
+            continue
+
+        if isinstance(value, cq.Assembly):
+            models[name] = value
+        elif isinstance(value, cq.Workplane):
+            if any(isinstance(v, cq.Shape) for v in value.vals()):
+                models[name] = value
+
+    return models
+
+def safe_name(name):
+    """Turn a model name into something usable as a file name."""
+
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") or "model"
+
+def export_model(model, stem, formats=export_formats):
+    """Export a model to each of the given formats, returning the paths that
+    were written.
+
+    Assemblies are written to STEP and glTF as assemblies, so that parts they
+    share are kept as instances. Workplanes are wrapped in a one-part
+    assembly for glTF, which only CadQuery's Assembly can write. STL gets the
+    whole thing as one compound."""
+    import cadquery as cq
+
+    paths = []
+
+    if isinstance(model, cq.Assembly):
+        shape = model.toCompound()
+
+        if "step" in formats:
+            model.export(stem + ".step")
+            paths.append(stem + ".step")
+
+        if "gltf" in formats:
+            model.export(stem + ".glb")
+            paths.append(stem + ".glb")
+    else:
+        shape = cq.Compound.makeCompound([v for v in model.vals() if isinstance(v, cq.Shape)])
+
+        if "step" in formats:
+            cq.exporters.export(shape, stem + ".step")
+            paths.append(stem + ".step")
+
+        if "gltf" in formats:
+            cq.Assembly(shape, name=safe_name(os.path.basename(stem))).export(stem + ".glb")
+            paths.append(stem + ".glb")
+
+    if "stl" in formats:
+        cq.exporters.export(shape, stem + ".stl")
+        paths.append(stem + ".stl")
+
+    return paths
+
+def module_output_dir(path, output_dir):
+    """Pick the directory a script's models get exported into."""
+
+    relative = os.path.splitext(os.path.relpath(path))[0]
+    parts = [safe_name(p) for p in relative.split(os.sep) if p not in ("", ".", "..")]
+
+    return os.path.join(output_dir, *parts)
+
+def build_module(path, output_dir, formats=export_formats):
+    """Run a model script and export every model it defines.
+
+    This is what each worker process runs. Returns a dict describing what
+    was built, including the error if the script failed."""
+
+    report = {"module": path, "build_time": 0, "models": [], "error": None}
+    old_path = list(sys.path)
+
+    try:
+        sys.path[:0] = [os.path.dirname(os.path.abspath(path)), repo_dir]
+
+        start = time.perf_counter()
+        namespace = runpy.run_path(path)
+        report["build_time"] = time.perf_counter() - start
+
+        directory = module_output_dir(path, output_dir)
+        os.makedirs(directory, exist_ok=True)
+
+        for name, model in find_models(namespace).items():
+            start = time.perf_counter()
+            paths = export_model(model, os.path.join(directory, safe_name(name)), formats)
+
+            report["models"].append({
+                "name": name,
+                "export_time": time.perf_counter() - start,
+                "paths": paths,
+            })
+    except Exception:
+        report["error"] = traceback.format_exc()
+    finally:
+        sys.path[:] = old_path
+
+    return report
+
+def find_scripts(paths):
+    """Expand a list of files and directories into model scripts."""
+
+    scripts = []
+
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if not d.startswith((".", "__")))
+                scripts.extend(os.path.join(root, f) for f in sorted(files) if f.endswith(".py"))
+        else:
+            scripts.append(path)
+
+    return scripts
+
+def print_summary(reports, wall_time, jobs, out=sys.stdout):
+    """Print a table of per-model build and export times."""
+
+    rows = []
+
+    for report in reports:
+        module = os.path.relpath(report["module"])
+
+        if report["error"] is not None:
+            rows.append((module, "(failed)", report["build_time"], 0))
+
+        for model in report["models"]:
+            rows.append((module, model["name"], report["build_time"], model["export_time"]))
+
+    rows.sort(key=lambda r: r[2] + r[3], reverse=True)
+
+    module_width = max([len(r[0]) for r in rows] + [6])
+    model_width = max([len(r[1]) for r in rows] + [5])
+
+    print(f"{'module':<{module_width}}  {'model':<{model_width}}  {'build':>9}  {'export':>9}", file=out)
+
+    for module, model, build_time, export_time in rows:
+        print(f"{module:<{module_width}}  {model:<{model_width}}  {build_time:>8.2f}s  {export_time:>8.2f}s", file=out)
+
+    models = sum(len(r["models"]) for r in reports)
+    print(f"\n{models} models from {len(reports)} scripts in {wall_time:.2f}s using {jobs} workers", file=out)
+    print("Build time is per script: every model in a script shares it.", file=out)
+
+def build(args):
+    scripts = find_scripts(args.paths)
+    formats = tuple(args.format or export_formats)
+    jobs = max(1, min(args.jobs, len(scripts)))
+
+    reports = []
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(build_module, script, args.output, formats) for script in scripts]
+
+        for future in as_completed(futures):
+            report = future.result()
+            reports.append(report)
+
+            if report["error"] is not None:
+                print(f"{report['module']} failed:\n{report['error']}", file=sys.stderr)
+
+    print_summary(reports, time.perf_counter() - start, jobs)
+
+    return 1 if any(r["error"] is not None for r in reports) else 0
+
+def parse_bed(text):
+    """Parse a print bed size like `220x220`."""
+
+    width, _, height = text.partition("x")
+
+    return (float(width), float(height or width))
+
+def tile(args):
+    import gridfinity_tiles
+
+    plan = gridfinity_tiles.plan_tiles(args.width, args.height, args.bed, args.margin)
+
+    start = time.perf_counter()
+    tiles = gridfinity_tiles.build_tiles(plan, args.magnets, args.weighted, not args.no_pins, args.jobs)
+    wall_time = time.perf_counter() - start
+
+    os.makedirs(args.output, exist_ok=True)
+    formats = tuple(args.format or export_formats)
+    counts = {}
+
+    for t in plan:
+        key = gridfinity_tiles.tile_key(t)[0]
+        counts[key] = counts.get(key, 0) + 1
+
+    import cadquery as cq
+
+    for key, (shape, build_time) in sorted(tiles.items()):
+        name = gridfinity_tiles.tile_name(key)
+        export_model(cq.Workplane("XY").newObject([shape]), os.path.join(args.output, name), formats)
+        print(f"{name:<20} x{counts[key]:<3} {build_time:>8.2f}s")
+
+    export_model(gridfinity_tiles.tiled_assembly(plan, tiles, gap=args.gap, name="baseplate"),
+        os.path.join(args.output, "baseplate"), [f for f in formats if f != "stl"])
+
+    print(f"\n{len(plan)} tiles, {len(tiles)} distinct, built in {wall_time:.2f}s")
+
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="gridfinity", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="build and export every model in a set of scripts")
+    build_parser.add_argument("paths", nargs="+", help="model scripts, or directories to search for them")
+    build_parser.add_argument("-o", "--output", default="build", help="directory to export models into")
+    build_parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    build_parser.add_argument("-f", "--format", action="append", choices=("step", "stl", "gltf"),
+        help="export format; may be given more than once (default: step and stl)")
+    build_parser.set_defaults(func=build)
+
+    tile_parser = commands.add_parser("tile", help="split a baseplate into tiles that fit on the print bed")
+    tile_parser.add_argument("width", type=int, help="baseplate width, in grid units")
+    tile_parser.add_argument("height", type=int, help="baseplate height, in grid units")
+    tile_parser.add_argument("--bed", type=parse_bed, default=(220, 220), help="print bed size in mm (default: 220x220)")
+    tile_parser.add_argument("--margin", type=float, default=5, help="space to leave around each tile, in mm (default: %(default)s)")
+    tile_parser.add_argument("--magnets", action="store_true", help="add magnet holes")
+    tile_parser.add_argument("--weighted", action="store_true", help="add weight pockets")
+    tile_parser.add_argument("--no-pins", action="store_true", help="leave out the seam pin holes")
+    tile_parser.add_argument("--gap", type=float, default=0, help="space between tiles in the assembled baseplate, in mm")
+    tile_parser.add_argument("-o", "--output", default="tiles", help="directory to export tiles into")
+    tile_parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    tile_parser.add_argument("-f", "--format", action="append", choices=("step", "stl", "gltf"),
+        help="export format; may be given more than once (default: step and stl)")
+    tile_parser.set_defaults(func=tile)
+
+    args = parser.parse_args(argv)
+
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+from math import sqrt, pow, sin, cos, tan, pi
+
+## Gridfinity dimensions
+##
+## Everything in here is plain arithmetic, so it can be imported (e.g. for
+## sizing blocks) without loading CadQuery. `gridfinity` re-exports all of it.
+
+## Gridfinity basic parameters - don't touch unless you really want a custom
+## grid that won't mate with anything on Thingiverse!
+## 
+## All dimensions derived from original Zach STLs with Blender.
+
+# The size of a 1x1 baseplate.
+grid_unit = 42 #mm
+
+# The margin between two 1x1 storage blocks placed next to each other on a
+# baseplate.
+block_spacing = 0.5 #mm
+
+# The depth of a 1x1x2 divider bin block, including stacking clearance.
+# 
+# Technically, this is *double* our "depth unit"; all plug-in depth
+# calculations will be done on half this amount. However, you should not
+# generate depth-1 storage blocks; the system wants blocks whose height is a
+# multiple of 2 or 3 depth units.
+grid_depth = 18.75 #mm
+
+# The cutaway area on top of a Gridfinity block.
+# 
+# All Gridfinity blocks have this amount of space cut out off the top of the
+# grid depth calculation to allow separating two stacked blocks.
+stacking_clearance_depth = 0.954 #mm
+
+## Mating surface
+
+# Master radius for all fillets on the mating surfaces of a baseplate and
+# block.
+# 
+# Fillet radius decreases in concert with the rectangle being rounded off
+# such that all fillets have the same origin.
+fillet_radius = 4 #mm
+
+# The total depth of the block mating surface.
+block_mating_depth = 4.75 #mm
+
+# The total depth of the baseplate mating surface.
+baseplate_mating_depth = 4.4 #mm
+
+# The total depth of the upper mating surface used for stacking blocks onto
+# other blocks.
+#
+# This is less than the baseplate mating depth because blocks have an inset top
+# chamfer.
+stacking_mating_depth = 3.796 #mm
+
+# Inset of the XY profile for the non-chamfered part of the mating surface
+# on blocks.
+block_mating_inset = 2.4 #mm
+
+# Inset of the XY profile for the non-chamfered part of the mating surface on
+# baseplates and stacking lips.
+baseplate_mating_inset = 2.15 #mm
+
+# Chamfer radius for the block mating lip's bottom chamfer.
+block_mating_chamfer = 0.8 #mm
+
+# Width/radius of the block stacking lip.
+block_stacking_lip = 0.77426 #mm
+
+# Chamfer radius for the block stacking lip's bottom chamfer.
+block_stacking_chamfer = 0.69645 #mm
+
+## MAG-a-nets
+##
+## Gridfinity blocks have holes for optional magnets. Weighted baseplates, too.
+## The holes are actually counterbores that also support M5 screws.
+
+# Offset from the edge of the grid to the center of each magnet.
+magnet_inset = 8 #mm
+
+# The diameter of the magnets 
+magnet_diameter = 6.5 #mm
+
+magnet_depth = 2.4 #mm
+
+## Screw boreholes
+
+# Diameter of the counterbore hole for screws.
+screw_diameter = 3.5 #mm
+
+# Maximum depth of the screw borehole.
+# 
+# Gridfinity isn't entirely consistent with the depth of the screw bore; some
+# blocks go all the way to the base of the block interior. IDK why lol
+screw_depth = 6 #mm
+
+## Baseplates
+##
+## Plain baseplates are just a frame of sockets. Baseplates with magnets or
+## weights need a floor under the sockets to hold them.
+
+# Thickness of the floor under the sockets of a baseplate with magnet holes.
+# This leaves 0.8mm under each magnet.
+baseplate_floor_depth = 3.2 #mm
+
+# Thickness of the floor under the sockets of a weighted baseplate.
+weighted_floor_depth = 6.4 #mm
+
+# Width and depth of the square pocket for a weight, cut into the bottom of
+# each cell of a weighted baseplate.
+weight_pocket_width = 21.4 #mm
+weight_pocket_depth = 4 #mm
+
+# Holes for the pins that line up neighbouring tiles of a baseplate that was
+# split up to fit on a print bed. Sized for a piece of 1.75mm filament.
+seam_pin_diameter = 2 #mm
+seam_pin_depth = 6 #mm
+
+## Utilities
+def block_extrusion(depth):
+    """Calculate the height of a block some number of units tall, discounting
+    the mating lip at the bottom.
+    
+    This is used to extrude the height of a Gridfinity block."""
+    return (grid_depth - block_mating_depth) / 2 * depth - stacking_clearance_depth
+
+def block_top_surface(depth):
+    """Calculate the height of a block some number of units tall, discounting
+    the mating lip at the bottom and the stacking lip at the top.
+    
+    This is useful for picking faces or edges at the surface of a (non-hollow)
+    Gridfinity block."""
+    return block_extrusion(depth) - stacking_mating_depth
+
+def block_cut_limit(depth):
+    """Calculate the maximum you can cut into a block of a given depth without
+    interfering with the screw counterbores."""
+
+    return block_extrusion(depth) - max(screw_depth - block_mating_depth, 0) - stacking_mating_depth
+
+def baseplate_floor(magnets=False, weighted=False):
+    """Calculate the thickness of the floor under the sockets of a baseplate.
+
+    Plain baseplates don't have a floor at all."""
+
+    if weighted:
+        return weighted_floor_depth
+
+    if magnets:
+        return baseplate_floor_depth
+
+    return 0
+
+# Inset of the top surface from the edge of the grid, i.e. where the stacking
+# lip's bottom chamfer meets the top surface.
+top_surface_inset = block_mating_inset + block_stacking_chamfer
+
+# Radius of the top surface's rounded corners. Like every other inset
+# profile, it shares its fillet origins with the outside of the block.
+top_surface_fillet = fillet_radius - top_surface_inset
+
+def top_surface_length(length):
+    """Calculate the interior length of the top surface of a Gridfinity block.
+
+    This takes into account the stacking lip, so you can cut profiles into your
+    block that are not going to interfere with it. A rectangle constructed
+    using the dimensions of this function will end right at the start of the
+    stacking lip chamfer.
+    
+    The length (width or height) is in grid units."""
+
+    return length * grid_unit - block_mating_inset * 2 - block_stacking_chamfer * 2
+
+def top_surface_area(width, height):
+    """Calculate the area of the top surface of a block, inside the stacking
+    lip, in square millimeters.
+
+    The top surface is a rounded rectangle, so this is the area of its
+    bounding rectangle minus what the four corner fillets take away."""
+
+    return top_surface_length(width) * top_surface_length(height) \
+        - (4 - pi) * top_surface_fillet ** 2
+
+def stacking_lip_profile(lip_fillet=block_stacking_lip):
+    """Calculate the cross-section of the stacking lip on top of a block.
+
+    The profile is a list of segments, each of which is either two points (a
+    line) or three points (an arc through the middle point). Points are
+    `(inset, z)` pairs: the inset is measured inwards from the edge of the
+    grid, and Z is measured from the top of the block.
+
+    The profile starts at the bottom of the outer wall, goes up and over the
+    lip, and ends where the lip's bottom chamfer meets the floor of the
+    stacking pocket. `lip_fillet` is the radius of the fillet between the top
+    of the lip and its chamfer."""
+
+    outer = block_spacing / 2
+    floor = stacking_mating_depth * -1
+    top_chamfer = block_mating_inset - block_spacing * 0.5 - block_stacking_lip
+    edge_fillet = block_stacking_lip / 2
+
+    # The fillet between the top of the lip and its chamfer turns through 45
+    # degrees, so it starts this far away from the corner it's rounding off.
+    tangent = lip_fillet * tan(pi / 8)
+
+    lip_top = (outer + block_stacking_lip - tangent, 0)
+    lip_chamfer = (outer + block_stacking_lip + tangent / sqrt(2), tangent / sqrt(2) * -1)
+
+    return [
+        ((outer, floor), (outer, edge_fillet * -1)),
+        ((outer, edge_fillet * -1),
+            (outer + edge_fillet - edge_fillet * cos(pi / 4), edge_fillet * (sin(pi / 4) - 1)),
+            (outer + edge_fillet, 0)),
+        ((outer + edge_fillet, 0), lip_top),
+        (lip_top,
+            (lip_top[0] + lip_fillet * sin(pi / 8), lip_fillet * (cos(pi / 8) - 1)),
+            lip_chamfer),
+        (lip_chamfer, (block_mating_inset, top_chamfer * -1)),
+        ((block_mating_inset, top_chamfer * -1), (block_mating_inset, floor + block_stacking_chamfer)),
+        ((block_mating_inset, floor + block_stacking_chamfer), (block_mating_inset + block_stacking_chamfer, floor)),
+    ]
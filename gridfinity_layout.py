@@ -0,0 +1,257 @@
+"""Fast 2D checks for laying out holes in the top of a Gridfinity block.
+
+Cutting and filleting a block full of holes takes minutes, and when two holes
+overlap, or a hole cuts into the stacking lip, the fillets fail only at the
+very end. Every hole footprint here is a circle, so a whole layout can be
+checked with a couple of NumPy operations before any OCCT call:
+
+    problems = gridfinity_layout.placement_problems(centers, radii, 2, 2)
+
+Coordinates are millimeters on the top surface, centered on the block, like
+a workplane on a block's top face. Only NumPy is needed."""
+
+from math import cos, pi
+
+import numpy as np
+
+from gridfinity_dims import *
+
+def hex_circumradius(across_flats):
+    """Calculate the radius of the circle around a hexagon with a given
+    across-flats width."""
+    return across_flats / cos(pi / 6) / 2
+
+def collisions(centers, radii, clearance=0):
+    """Find every pair of circles that overlap, or come closer than
+    `clearance` to each other.
+
+    Returns an array of (i, j) index pairs with i < j."""
+
+    centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+    radii = np.broadcast_to(np.asarray(radii, dtype=float), (len(centers),))
+
+    distance = np.linalg.norm(centers[:, None, :] - centers[None, :, :], axis=-1)
+    overlap = distance < radii[:, None] + radii[None, :] + clearance
+
+    return np.argwhere(np.triu(overlap, k=1))
+
+def top_surface_distance(points, width, height):
+    """Calculate the signed distance from points to the edge of a block's top
+    surface, inside the stacking lip. Points inside are negative.
+
+    The top surface is a rounded rectangle `top_surface_length` long on each
+    side, so this is the usual rounded box distance."""
+
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    half = np.array([top_surface_length(width), top_surface_length(height)]) / 2
+
+    q = np.abs(points) - (half - top_surface_fillet)
+    outside = np.linalg.norm(np.maximum(q, 0), axis=-1)
+    inside = np.minimum(q.max(axis=-1), 0)
+
+    return outside + inside - top_surface_fillet
+
+def keep_out_violations(centers, radii, width, height, clearance=0):
+    """Find every circle that doesn't fit on the top surface of a `width` by
+    `height` block, staying `clearance` away from the stacking lip.
+
+    Returns an array of indices."""
+
+    radii = np.broadcast_to(np.asarray(radii, dtype=float), (len(centers),))
+
+    return np.flatnonzero(top_surface_distance(centers, width, height) + radii + clearance > 0)
+
+def placement_problems(centers, radii, width, height, clearance=0):
+    """Check a layout of circular footprints on a block's top surface.
+
+    Returns `(collisions, violations)`: index pairs of circles that overlap,
+    and indices of circles that cut into the stacking lip. Both are empty if
+    the layout is fine."""
+
+    return collisions(centers, radii, clearance), \
+        keep_out_violations(centers, radii, width, height, clearance)
+
+## Layout optimizers
+def rectangle_footprint(xmin, ymin, xmax, ymax):
+    """Cover a rectangle with a row of circles, as a list of (x, y, radius).
+
+    The rectangle is split into roughly square pieces along its longer side,
+    and each piece gets the circle that passes through its corners."""
+
+    width, height = xmax - xmin, ymax - ymin
+    count = max(1, int(np.ceil(max(width, height) / max(min(width, height), 1e-9))))
+
+    if width >= height:
+        step = width / count
+        radius = np.hypot(step, height) / 2
+        return [(xmin + step * (k + 0.5), (ymin + ymax) / 2, radius) for k in range(count)]
+    else:
+        step = height / count
+        radius = np.hypot(width, step) / 2
+        return [((xmin + xmax) / 2, ymin + step * (k + 0.5), radius) for k in range(count)]
+
+def candidate_points(width, height, step):
+    """Lay a square grid of candidate points over the top surface of a
+    block."""
+
+    xs = np.arange(0, top_surface_length(width) / 2, step)
+    ys = np.arange(0, top_surface_length(height) / 2, step)
+    xs = np.concatenate([-xs[:0:-1], xs])
+    ys = np.concatenate([-ys[:0:-1], ys])
+
+    return np.stack(np.meshgrid(xs, ys, indexing="ij"), axis=-1).reshape(-1, 2)
+
+def pack(footprints, width, height, clearance=0, step=0.5, chunk=1024):
+    """Find a compact layout for a list of footprints on the top surface of a
+    `width` by `height` block.
+
+    Each footprint is a list of (x, y, radius) circles around the point the
+    footprint is placed at, e.g. a hole and its label. Footprints are placed
+    one at a time, biggest first, at whichever point on a `step` grid keeps
+    them closest to the middle of the block without overlapping anything
+    placed so far or cutting into the stacking lip.
+
+    Returns one (x, y) placement per footprint, in the same order, ready for
+    `pushPoints`. Raises ValueError if a footprint doesn't fit anywhere."""
+
+    footprints = [np.asarray(f, dtype=float).reshape(-1, 3) for f in footprints]
+    candidates = candidate_points(width, height, step)
+
+    placed = np.empty((0, 3))
+    placements = [None] * len(footprints)
+
+    for i in sorted(range(len(footprints)), key=lambda i: -(footprints[i][:, 2] ** 2).sum()):
+        circles = footprints[i]
+
+        # Rule out points that would cut into the stacking lip first, since
+        # that's cheap, then check what's left against everything placed.
+        centers = candidates[:, None, :] + circles[None, :, :2]
+        fits = (top_surface_distance(centers.reshape(-1, 2), width, height).reshape(centers.shape[:2])
+                + circles[:, 2] + clearance <= 0).all(axis=1)
+
+        points = candidates[fits]
+        centers = centers[fits]
+
+        # Try points closest to the middle first, a chunk at a time, and stop
+        # at the first one that's free.
+        order = np.argsort(np.linalg.norm(points + circles[:, :2].mean(axis=0), axis=1))
+        points = points[order]
+        centers = centers[order]
+        best = None
+
+        for start in range(0, len(points), chunk):
+            offset = centers[start:start + chunk, :, None, :] - placed[None, None, :, :2]
+            limit = circles[None, :, 2, None] + placed[None, None, :, 2] + clearance
+            free = ((offset ** 2).sum(axis=-1) >= limit ** 2).all(axis=(1, 2))
+
+            if free.any():
+                best = points[start + np.argmax(free)]
+                break
+
+        if best is None:
+            raise ValueError(f"Footprint {i} doesn't fit on a {width}x{height} block")
+
+        placements[i] = (float(best[0]), float(best[1]))
+        placed = np.concatenate([placed, circles + (best[0], best[1], 0)])
+
+    return placements
+
+def hex_layout(radius, width, height, clearance=0):
+    """Fit as many circles of one size as possible on the top surface of a
+    `width` by `height` block, on a hexagonal grid.
+
+    A few offsets and both orientations of the grid are tried; the one that
+    fits the most circles wins, with ties going to the most centered layout.
+    Returns a list of (x, y) placements, which may be empty."""
+
+    pitch = radius * 2 + clearance
+    row = pitch * np.sqrt(3) / 2
+    reach = max(top_surface_length(width), top_surface_length(height)) / 2
+
+    columns = np.arange(-np.ceil(reach / pitch) - 1, np.ceil(reach / pitch) + 2)
+    rows = np.arange(-np.ceil(reach / row) - 1, np.ceil(reach / row) + 2)
+    i, j = np.meshgrid(columns, rows, indexing="ij")
+    lattice = np.stack([(i + (j % 2) / 2) * pitch, j * row], axis=-1).reshape(-1, 2)
+
+    best = np.empty((0, 2))
+    best_spread = np.inf
+
+    for dx in (0, pitch / 2):
+        for dy in (0, row / 2):
+            for swap in (False, True):
+                points = lattice + (dx, dy)
+                if swap:
+                    points = points[:, ::-1]
+
+                points = points[top_surface_distance(points, width, height) + radius <= 0]
+                spread = np.abs(points).max() if len(points) > 0 else 0
+
+                if len(points) > len(best) or (len(points) == len(best) and spread < best_spread):
+                    best, best_spread = points, spread
+
+    return [(float(x), float(y)) for x, y in best]
+
+## Sizing
+
+# Block depths that stack nicely: multiples of 2 or 3 depth units.
+recommended_depths = [d for d in range(2, 25) if d % 2 == 0 or d % 3 == 0]
+
+def smallest_depth(cut_depth, depths=recommended_depths):
+    """Find the shallowest block depth that can have `cut_depth` millimeters
+    cut into its top surface, according to `block_cut_limit`."""
+
+    for depth in depths:
+        if block_cut_limit(depth) >= cut_depth:
+            return depth
+
+    raise ValueError(f"No block is deep enough to cut {cut_depth}mm into")
+
+def block_sizes(max_size, square=False):
+    """List block sizes up to `max_size` units on a side, smallest footprint
+    first. Sizes with the same footprint are listed squarest first."""
+
+    sizes = [(w, h) for w in range(1, max_size + 1) for h in range(1, max_size + 1)
+             if not square or w == h]
+
+    return sorted(sizes, key=lambda s: (s[0] * s[1], abs(s[0] - s[1]), s[0]))
+
+def footprints_fit(footprints, clearance=0, step=0.5):
+    """Make a `fits(width, height)` check for `smallest_block` that tries to
+    `pack` a list of footprints.
+
+    Blocks whose top surface is smaller than the biggest circle of every
+    footprint put together are ruled out without trying to pack them."""
+
+    footprints = [np.asarray(f, dtype=float).reshape(-1, 3) for f in footprints]
+    needed = sum(pi * (f[:, 2].max() + clearance / 2) ** 2 for f in footprints)
+
+    def fits(width, height):
+        available = top_surface_area(width, height)
+
+        if needed > available:
+            return False
+
+        try:
+            pack(footprints, width, height, clearance, step)
+        except ValueError:
+            return False
+
+        return True
+
+    return fits
+
+def smallest_block(fits, cut_depth=0, max_size=6, square=False, depths=recommended_depths):
+    """Find the smallest block that a set of items fits in.
+
+    `fits(width, height)` says whether the items can be laid out on the top
+    surface of a block that size, and `cut_depth` is how deep they need to be
+    cut into it. Returns `(width, height, depth)`; raises ValueError if
+    nothing up to `max_size` units on a side works."""
+
+    depth = smallest_depth(cut_depth, depths)
+
+    for width, height in block_sizes(max_size, square):
+        if fits(width, height):
+            return width, height, depth
+
+    raise ValueError(f"Nothing fits on a block up to {max_size}x{max_size}")
@@ -0,0 +1,860 @@
+import cadquery as cq
+import logging, os
+from collections import OrderedDict
+from contextlib import contextmanager
+from math import ceil
+from OCP.BRepFilletAPI import BRepFilletAPI_MakeFillet
+from time import perf_counter
+from gridfinity_cache import cached
+from gridfinity_dims import *
+
+## CADQuery plugins for designing Gridfinity blocks
+##
+## Importing this module registers every plugin on `cq.Workplane`. You
+## normally don't import it yourself: `import gridfinity` does it as soon as
+## CadQuery is loaded.
+
+log = logging.getLogger("gridfinity")
+
+## Cleaning
+##
+## Booleans split faces up, and `clean` merges them back together. It runs
+## over the whole solid every time, so a long chain of plugins spends much of
+## its time cleaning intermediate results that nothing ever looks at.
+
+# Set GRIDFINITY_DEFER_CLEAN=0 to make `deferred_clean` do nothing, e.g. to
+# compare build times with and without it.
+defer_clean = os.environ.get("GRIDFINITY_DEFER_CLEAN", "1") != "0"
+
+# How many `deferred_clean` blocks we are inside of.
+_clean_deferred = 0
+
+@contextmanager
+def deferred_clean():
+    """Skip the clean after each boolean in the Gridfinity plugins and
+    example helpers while building a model.
+
+    Call `gridfinity_clean` on the finished model, still inside the block, to
+    clean it once at the end:
+
+        with gridfinity.deferred_clean():
+            block = cq.Workplane("XY").gridfinity_block(2, 2, 3)
+            block = block.gridfinity_block_stack(2, 2).gridfinity_block_lip(2, 2)
+            block = block.gridfinity_clean()"""
+    global _clean_deferred
+
+    _clean_deferred += 1
+
+    try:
+        yield
+    finally:
+        _clean_deferred -= 1
+
+def clean_enabled():
+    """Check whether booleans should clean their result, i.e. whether we are
+    outside of `deferred_clean`.
+
+    Pass this as the `clean` argument of CadQuery operations that clean by
+    default."""
+
+    return _clean_deferred == 0 or not defer_clean
+
+## Utilities
+def inset_profile(width, height, inset):
+    """Generate a sketch for a rectangle of some size, inset by some amount.
+    
+    Amount must not exceed twice the Gridfinity fillet radius."""
+    return cq.Sketch()\
+        .rect(width * grid_unit - inset * 2, height * grid_unit - inset * 2)\
+        .vertices()\
+        .fillet(fillet_radius - inset)
+
+def baseplate_profile(width, height, seams=(False, False, False, False)):
+    """Generate the outline of a baseplate, or of one tile of a baseplate.
+
+    `seams` says which sides (left, right, bottom, top) meet another tile.
+    Only corners on the outside of the whole baseplate are rounded off;
+    corners on a seam stay square, so that neighbouring tiles fit together
+    without a notch."""
+
+    left, right, bottom, top = seams
+    profile = cq.Sketch().rect(width * grid_unit, height * grid_unit)
+
+    for x_side, x_seam in (("<X", left), (">X", right)):
+        for y_side, y_seam in (("<Y", bottom), (">Y", top)):
+            if not x_seam and not y_seam:
+                profile = profile.vertices(f"{x_side} and {y_side}").fillet(fillet_radius).reset()
+
+    return profile
+
+def block_lip_cell():
+    """Generate the mating lip for a single 1x1 grid cell, as a solid.
+
+    The lip hangs down from Z=0 and already includes the 45 degree chamfer
+    that joins it to the bottom of the block, so it can be patterned across a
+    block without any further edge selection.
+
+    The chamfer is a ruled loft between two inset profiles rather than an
+    actual chamfer operation. This works because every inset profile shares
+    the same fillet origins."""
+
+    chamfer = block_mating_inset - block_spacing * 0.5 - 0.01
+
+    lip = cq.Workplane("XY")\
+        .placeSketch(inset_profile(1, 1, block_mating_inset))\
+        .extrude(block_mating_depth * -1)\
+        .edges("<Z")\
+        .chamfer(block_mating_chamfer)
+
+    taper = cq.Workplane("XY")\
+        .workplane(offset=chamfer * -1)\
+        .placeSketch(
+            inset_profile(1, 1, block_mating_inset),
+            inset_profile(1, 1, block_mating_inset - chamfer)\
+                .moved(cq.Location(cq.Vector(0, 0, chamfer))))\
+        .loft(ruled=True)
+
+    return lip.union(taper).val()
+
+def baseplate_socket_cell(magnets=False, weighted=False):
+    """Generate the tool that cuts one 1x1 socket into the top of a
+    baseplate, as a solid.
+
+    The socket hangs down from Z=0. Its chamfers are a ruled loft between
+    inset profiles, like `block_lip_cell`, so the tool comes out finished and
+    can be patterned across a baseplate without any edge selection. The top
+    chamfer carries on a little past the edge of the cell, above Z=0, so
+    that neighbouring sockets overlap rather than touch.
+
+    With magnets, the tool includes the magnet holes in the floor; with
+    weights, it includes the weight pocket in the bottom of the baseplate.
+    Plain sockets go straight through, since plain baseplates have no
+    floor."""
+
+    floor = baseplate_floor(magnets, weighted)
+    bottom_inset = baseplate_mating_inset + block_stacking_chamfer
+
+    # (inset, z) of each section, from the top down.
+    sections = [
+        (-1, 1),
+        (baseplate_mating_inset, baseplate_mating_inset * -1),
+        (baseplate_mating_inset, (baseplate_mating_depth - block_stacking_chamfer) * -1),
+        (bottom_inset, baseplate_mating_depth * -1),
+    ]
+
+    if floor == 0:
+        sections.append((bottom_inset, baseplate_mating_depth * -1 - 1))
+
+    socket = cq.Workplane("XY")\
+        .placeSketch(*[inset_profile(1, 1, inset).moved(cq.Location(cq.Vector(0, 0, z)))
+            for inset, z in sections])\
+        .loft(ruled=True)
+
+    if magnets:
+        socket = socket\
+            .faces("<Z")\
+            .workplane()\
+            .rect(grid_unit - magnet_inset * 2, grid_unit - magnet_inset * 2, forConstruction=True)\
+            .vertices()\
+            .circle(magnet_diameter / 2)\
+            .extrude(magnet_depth)
+
+    if weighted:
+        socket = socket.union(cq.Workplane("XY")\
+            .workplane(offset=(baseplate_mating_depth + floor + 1) * -1)\
+            .rect(weight_pocket_width, weight_pocket_width)\
+            .extrude(weight_pocket_depth + 1))
+
+    return socket.val()
+
+# Hole patterns `block_hole_positions` understands.
+hole_patterns = ("all", "perimeter", "corners")
+
+def block_hole_positions(width, height, holes=True):
+    """List the (x, y) positions of the magnet and screw holes in the bottom
+    of a block, centered on the origin.
+
+    See `gridfinity_block_lip` for the hole patterns."""
+
+    if holes is True:
+        holes = "all"
+
+    if not holes:
+        return []
+
+    if holes not in hole_patterns:
+        raise ValueError(f"Unknown hole pattern {holes!r}, expected one of {hole_patterns}")
+
+    offset = grid_unit / 2 - magnet_inset
+    half_x = (width - 1) * grid_unit / 2
+    half_y = (height - 1) * grid_unit / 2
+
+    if holes == "corners":
+        return [(sx * (half_x + offset), sy * (half_y + offset)) for sx in (-1, 1) for sy in (-1, 1)]
+
+    positions = []
+
+    for i in range(width):
+        for j in range(height):
+            if holes == "perimeter" and 0 < i < width - 1 and 0 < j < height - 1:
+                continue
+
+            x = i * grid_unit - half_x
+            y = j * grid_unit - half_y
+
+            positions.extend((x + sx * offset, y + sy * offset) for sx in (-1, 1) for sy in (-1, 1))
+
+    return positions
+
+def counterbore_tool(depth=screw_depth):
+    """Generate the tool for one magnet and screw hole, as a solid going up
+    from Z=0: a screw hole `depth` deep with a magnet pocket at the bottom."""
+
+    screw = cq.Solid.makeCylinder(screw_diameter / 2, depth, cq.Vector(), cq.Vector(0, 0, 1))
+    magnet = cq.Solid.makeCylinder(magnet_diameter / 2, magnet_depth, cq.Vector(), cq.Vector(0, 0, 1))
+
+    return screw.fuse(magnet)
+
+def pocket_sketch(outlines, fillet=None):
+    """Combine the outlines of several pockets into one sketch, so they can
+    all be cut with a single `gridfinity_cut_pockets`.
+
+    Each outline is a `cq.Sketch`, or a `(sketch, location)` pair to move it
+    into place first. Overlapping outlines are fused together. Corners are
+    best filleted on each outline before combining them; `fillet` rounds
+    every corner of the combined sketch instead."""
+
+    combined = cq.Sketch()
+
+    for outline in outlines:
+        if isinstance(outline, tuple):
+            outline = outline[0].moved(outline[1])
+
+        combined = combined.face(outline, mode="a")
+
+    combined = combined.clean()
+
+    if fillet is not None:
+        combined = combined.vertices().fillet(fillet).reset()
+
+    return combined
+
+def profile_wire(segments, to_vector):
+    """Build a wire out of a list of line and arc segments, such as the one
+    returned by `stacking_lip_profile`.
+
+    `to_vector` converts each 2D profile point into a `cq.Vector`."""
+
+    edges = []
+
+    for segment in segments:
+        points = [to_vector(p) for p in segment]
+
+        if len(points) == 2:
+            edges.append(cq.Edge.makeLine(*points))
+        else:
+            edges.append(cq.Edge.makeThreePointArc(*points))
+
+    return cq.Wire.assembleEdges(edges)
+
+def inset_path(width, height, inset):
+    """Generate a wire that follows the outline of `inset_profile`.
+
+    The wire starts halfway along the +X side and runs counterclockwise, so
+    that it can be used as a sweep path."""
+
+    x = width * grid_unit / 2 - inset
+    y = height * grid_unit / 2 - inset
+    r = fillet_radius - inset
+    arc_x = x - r + r * cos(pi / 4)
+    arc_y = y - r + r * sin(pi / 4)
+
+    return profile_wire([
+        ((x, 0), (x, y - r)),
+        ((x, y - r), (arc_x, arc_y), (x - r, y)),
+        ((x - r, y), (r - x, y)),
+        ((r - x, y), (arc_x * -1, arc_y), (x * -1, y - r)),
+        ((x * -1, y - r), (x * -1, r - y)),
+        ((x * -1, r - y), (arc_x * -1, arc_y * -1), (r - x, y * -1)),
+        ((r - x, y * -1), (x - r, y * -1)),
+        ((x - r, y * -1), (arc_x, arc_y * -1), (x, r - y)),
+        ((x, r - y), (x, 0)),
+    ], lambda p: cq.Vector(p[0], p[1], 0))
+
+def stacking_lip_tool(width, height, inset=block_spacing / 2 - 1, lip_fillet=block_stacking_lip):
+    """Generate a solid that cuts a finished stacking lip into a block whose
+    top is at Z=0.
+
+    The stacking lip cross-section is swept around the outline of the block
+    (as straight extrusions along the sides and revolutions at the corners)
+    and subtracted from a slab covering everything above the stacking pocket
+    floor, so the tool removes the pocket and shapes the lip in one cut.
+
+    `inset` sets the outline of that slab; the default reaches past the edge
+    of the block. Pass a larger inset to leave material at the edge alone."""
+
+    floor = stacking_mating_depth * -1
+    outer = block_spacing / 2
+    segments = stacking_lip_profile(lip_fillet)
+
+    # Close the profile off underneath the pocket floor, so that the sweep is
+    # a solid and doesn't share any faces with the slab.
+    bottom = floor - 1
+    segments.extend([
+        (segments[-1][-1], (segments[-1][-1][0], bottom)),
+        ((segments[-1][-1][0], bottom), (outer, bottom)),
+        ((outer, bottom), segments[0][0]),
+    ])
+
+    # Sweeping the profile around the whole outline in one go approximates
+    # the corners with B-splines, which `clean` can't merge with the straight
+    # sides once the block is longer than 3 units. Build the sides and corners
+    # separately instead: each corner is the profile revolved about the centre
+    # of the block's corner fillet, where it sits `fillet_radius - inset` out.
+    profile = profile_wire(segments, lambda p: cq.Vector(fillet_radius - p[0], 0, p[1]))
+    x = width * grid_unit / 2 - fillet_radius
+    y = height * grid_unit / 2 - fillet_radius
+    z_axis = cq.Vector(0, 0, 1)
+    origin = cq.Vector(0, 0, 0)
+    corner = cq.Solid.revolve(profile, [], 90, origin, z_axis)
+
+    pieces = []
+    for angle, start, end in [
+        (0, (x, y * -1), (x, y)),
+        (90, (x, y), (x * -1, y)),
+        (180, (x * -1, y), (x * -1, y * -1)),
+        (270, (x * -1, y * -1), (x, y * -1)),
+    ]:
+        start = cq.Vector(*start, 0)
+        side = profile.rotate(origin, z_axis, angle)
+        pieces.append(cq.Solid.extrudeLinear(side, [], cq.Vector(*end, 0) - start).moved(cq.Location(start)))
+        pieces.append(corner.rotate(origin, z_axis, angle).moved(cq.Location(cq.Vector(*end, 0))))
+
+    lip = pieces[0].fuse(*pieces[1:], glue=True).clean()
+
+    slab = cq.Workplane("XY")\
+        .workplane(offset=floor)\
+        .placeSketch(inset_profile(width, height, inset))\
+        .extrude(stacking_mating_depth + 1)\
+        .val()
+
+    return slab.cut(lip)
+
+def grid_footprint(shape):
+    """Calculate how many grid units a shape covers in X and Y, from its
+    bounding box."""
+
+    bb = shape.BoundingBox()
+
+    # Blocks are a little smaller than their grid cells, so round up; the
+    # tolerance stops exact multiples of the grid from rounding up again.
+    return ceil(bb.xlen / grid_unit - 1e-6), ceil(bb.ylen / grid_unit - 1e-6)
+
+def grid_assembly(parts, columns=None, gap=1, name=None):
+    """Lay out a set of parts on a grid in a new Assembly.
+
+    `parts` is a dict (or list of pairs) of names and Workplanes or shapes.
+    Every part gets a cell as big as the biggest part's Gridfinity footprint
+    plus `gap` grid units, filling rows of `columns` cells (by default, as
+    close to a square as possible) centered on the origin. Each part sits
+    centered in its cell with its bottom at Z=0.
+
+    Parts are placed with Locations, so no constraints need solving."""
+
+    parts = list(parts.items() if isinstance(parts, dict) else parts)
+    shapes = [p.findSolid() if isinstance(p, cq.Workplane) else p for _, p in parts]
+
+    if columns is None:
+        columns = max(1, ceil(len(parts) ** 0.5))
+
+    rows = ceil(len(parts) / columns)
+
+    footprints = [grid_footprint(s) for s in shapes]
+    pitch_x = (max([f[0] for f in footprints], default=0) + gap) * grid_unit
+    pitch_y = (max([f[1] for f in footprints], default=0) + gap) * grid_unit
+
+    assembly = cq.Assembly(name=name)
+
+    for i, ((part_name, part), shape) in enumerate(zip(parts, shapes)):
+        bb = shape.BoundingBox()
+        x = (i % columns - (columns - 1) / 2) * pitch_x - bb.center.x
+        y = ((rows - 1) / 2 - i // columns) * pitch_y - bb.center.y
+
+        assembly.add(part, name=part_name, loc=cq.Location(cq.Vector(x, y, bb.zmin * -1)))
+
+    return assembly
+
+## Selectors
+
+class PointIndex:
+    """A KD-tree over a fixed list of 3D points, for answering nearest-point
+    queries in logarithmic time."""
+
+    def __init__(self, points):
+        self.points = [tuple(p) for p in points]
+        self.root = self._build(list(range(len(self.points))), 0)
+
+    def _build(self, indices, axis):
+        if len(indices) == 0:
+            return None
+
+        indices.sort(key=lambda i: self.points[i][axis])
+        mid = len(indices) // 2
+        next_axis = (axis + 1) % 3
+
+        return (indices[mid], axis,
+                self._build(indices[:mid], next_axis),
+                self._build(indices[mid + 1:], next_axis))
+
+    def nearest(self, point):
+        """Find the index of the point nearest to a given point.
+
+        Ties go to the lowest index, just like picking the first nearest
+        object out of a list."""
+
+        best_index = None
+        best_distance = float("inf")
+
+        def search(node):
+            nonlocal best_index, best_distance
+
+            if node is None:
+                return
+
+            index, axis, left, right = node
+            candidate = self.points[index]
+            distance = sum((a - b) ** 2 for a, b in zip(candidate, point))
+
+            if distance < best_distance or (distance == best_distance and index < best_index):
+                best_index = index
+                best_distance = distance
+
+            offset = point[axis] - candidate[axis]
+            near, far = (left, right) if offset < 0 else (right, left)
+
+            search(near)
+
+            if offset * offset <= best_distance:
+                search(far)
+
+        search(self.root)
+
+        return best_index
+
+# Recently built indexes, keyed on the shapes they were built over.
+_point_indexes = OrderedDict()
+_point_index_limit = 32
+
+def object_index(objects):
+    """Get a `PointIndex` over the centers of a list of shapes.
+
+    Indexes are cached, so selecting from the same shape again (e.g. picking
+    several edges off one solid) only computes the centers once."""
+
+    key = tuple(hash(o) for o in objects)
+    cached = _point_indexes.get(key)
+
+    if cached is not None and all(a.isSame(b) for a, b in zip(cached[0], objects)):
+        _point_indexes.move_to_end(key)
+        return cached[1]
+
+    index = PointIndex(o.Center().toTuple() for o in objects)
+
+    _point_indexes[key] = (list(objects), index)
+
+    if len(_point_indexes) > _point_index_limit:
+        _point_indexes.popitem(last=False)
+
+    return index
+
+class NearestToPointsSelector(cq.Selector):
+    """Select the objects nearest to one or more points.
+
+    For a single point this picks the same object as
+    `cq.NearestToPointSelector`, but it looks it up in a cached KD-tree of
+    object centers instead of measuring every object. Given a list of points
+    it selects the nearest object to each of them, so that several edges can
+    be picked (and filleted) at once."""
+
+    def __init__(self, pnts):
+        pnts = list(pnts)
+
+        if len(pnts) > 0 and not isinstance(pnts[0], (tuple, list, cq.Vector)):
+            pnts = [pnts]
+
+        self.pnts = [(p if isinstance(p, cq.Vector) else cq.Vector(*p)).toTuple() for p in pnts]
+
+    def filter(self, objectList):
+        if len(objectList) == 0:
+            return []
+
+        index = object_index(objectList)
+        selected = []
+
+        for pnt in self.pnts:
+            i = index.nearest(pnt)
+
+            if all(o is not objectList[i] for o in selected):
+                selected.append(objectList[i])
+
+        return selected
+
+## Fillets
+##
+## Fillet requests are `(where, radius)` pairs; see `gridfinity_fillets`.
+
+def fillet_edges(solid, requests):
+    """Find the edges a list of `(where, radius)` fillet requests refer to.
+
+    Points are all looked up in one go, against a single index of the solid's
+    edges. Returns a list of `(edge, radius, where)` triples. An edge picked
+    by more than one request is only listed once, as long as they agree on
+    the radius; otherwise this raises a ValueError."""
+
+    edges = solid.Edges()
+    index = object_index(edges)
+    resolved = []
+
+    for where, radius in requests:
+        if isinstance(where, (tuple, list, cq.Vector)):
+            point = where if isinstance(where, cq.Vector) else cq.Vector(*where)
+            picked = [edges[index.nearest(point.toTuple())]]
+        else:
+            picked = cq.Workplane("XY").newObject([solid]).edges(where).vals()
+
+        for edge in picked:
+            earlier = [r for r in resolved if r[0].isSame(edge)]
+
+            if len(earlier) == 0:
+                resolved.append((edge, radius, where))
+            elif earlier[0][1] != radius:
+                raise ValueError(f"{where} (radius {radius}) picks the same edge as "
+                    f"{earlier[0][2]} (radius {earlier[0][1]})")
+
+    return resolved
+
+def fillet_once(solid, edges):
+    """Fillet a list of `(edge, radius, where)` triples from `fillet_edges`
+    in a single fillet operation.
+
+    Returns the filleted solid, or None if the kernel couldn't do it."""
+
+    builder = BRepFilletAPI_MakeFillet(solid.wrapped)
+
+    for edge, radius, _ in edges:
+        builder.Add(radius, edge.wrapped)
+
+    try:
+        builder.Build()
+    except Exception:
+        return None
+
+    if not builder.IsDone():
+        return None
+
+    result = cq.Shape.cast(builder.Shape())
+
+    return result if result.isValid() else None
+
+def fillet_failures(solid, accepted, edges):
+    """Find the edges that can't be filleted along with the rest.
+
+    `accepted` are edges already known to fillet together. `edges` that fail
+    along with them are split in half and tried again, always on the
+    original solid, until the edges at fault are found. Returns those, and
+    the edges that can be filleted, `accepted` included."""
+
+    if fillet_once(solid, accepted + edges) is not None:
+        return [], accepted + edges
+
+    if len(edges) == 1:
+        return list(edges), accepted
+
+    middle = len(edges) // 2
+    failed, accepted = fillet_failures(solid, accepted, edges[:middle])
+    more_failed, accepted = fillet_failures(solid, accepted, edges[middle:])
+
+    return failed + more_failed, accepted
+
+## Plugins
+@cached
+def gridfinity_block(self, width, height, depth):
+    """Create a Gridfinity block of a given width, height, and depth.
+    
+    The block depth will specifically exclude the height of the block lip. You
+    should call `gridfinity_block_lip` with the same width and height at the
+    end of constructing your block to add the mating surface necessary to
+    attach your block to a baseplate.
+    
+    Depths that are not a multiple of 2 or 3 are not recommended."""
+
+    return self.placeSketch(inset_profile(width, height, block_spacing / 2))\
+        .extrude(block_extrusion(depth))
+
+cq.Workplane.gridfinity_block = gridfinity_block
+
+@cached
+def gridfinity_block_stack(self, width, height, sweep=False):
+    """Cut Gridfinity block stacking lip out of the >Z face.
+    
+    Face dimensions must match the width and height given here.
+
+    Set `sweep=True` to cut the whole lip with a single tool swept from the
+    lip's cross-section, rather than cutting a pocket and then chamfering and
+    filleting edges of the block. This costs the same no matter how many
+    features the block already has."""
+
+    depth = self.faces(">Z").val().Center().toTuple()[2]
+
+    if sweep:
+        return self.cut(stacking_lip_tool(width, height)\
+            .moved(cq.Location(cq.Vector(0, 0, depth))), clean=clean_enabled())
+
+    inset = cq.Workplane("XY")\
+        .placeSketch(inset_profile(width, height, block_mating_inset))\
+        .extrude(stacking_mating_depth * -1)\
+        .translate([0, 0, depth])
+    
+    return self.faces(">Z")\
+        .cut(inset)\
+        .edges(cq.NearestToPointSelector([0, 0, depth]))\
+        .chamfer(block_mating_inset - block_spacing * 0.5 - block_stacking_lip)\
+        .edges(cq.NearestToPointSelector([0, 0, depth - block_mating_depth]))\
+        .chamfer(block_stacking_chamfer)\
+        .edges(cq.NearestToPointSelector([width * grid_unit / 2, height * grid_unit / 2, depth + 10]))\
+        .fillet(block_stacking_lip / 2)\
+        .edges(cq.NearestToPointSelector([width * grid_unit / 2 - block_stacking_lip * 4, height * grid_unit / 2 - block_stacking_lip * 4, depth + 2]))\
+        .fillet(block_stacking_lip)
+
+cq.Workplane.gridfinity_block_stack = gridfinity_block_stack
+
+@cached
+def gridfinity_block_lip(self, width, height, screw_depth=screw_depth, holes=True):
+    """Extrude Gridfinity block mating lip out of the <Z face.
+    
+    Face dimensions must match the width and height given here.
+    
+    Set `screw_depth=None` to allow the block lip's screw holes to go straight
+    through.
+    
+    `holes` picks which cells get magnet and screw holes: `True` or `"all"`
+    for every cell, `"perimeter"` for the cells around the edge of the block,
+    `"corners"` for just the outermost hole in each corner, or `False` for
+    none at all."""
+    
+    #TODO: Can we recover the Gridfinity units from the selected face's dimensions?
+    lip = block_lip_cell()
+
+    with_lips = self.faces("<Z")\
+        .rarray(grid_unit, grid_unit, width, height)\
+        .eachpoint(lambda c: lip.moved(c), combine="a", clean=clean_enabled())
+
+    positions = block_hole_positions(width, height, holes)
+
+    if len(positions) == 0:
+        return with_lips
+
+    bottom = with_lips.faces("<Z").val().Center().z
+    hole = counterbore_tool(with_lips.largestDimension() if screw_depth is None else screw_depth)
+
+    return with_lips.gridfinity_cut_many(
+        [hole.moved(cq.Location(cq.Vector(x, y, bottom))) for x, y in positions])
+
+cq.Workplane.gridfinity_block_lip = gridfinity_block_lip
+
+def gridfinity_cut_many(self, tools, clean=None):
+    """Cut a whole list of tools out of the current solid in one boolean.
+
+    Tools may be Workplanes or shapes. Cutting them one at a time runs a full
+    boolean against an ever more complicated solid for every tool; this hands
+    all of them to the kernel at once instead.
+
+    The result is cleaned unless `clean=False` is given, or this is running
+    inside `deferred_clean`.
+
+    The time taken by the boolean is logged at INFO level."""
+
+    solids = []
+
+    for tool in tools:
+        if isinstance(tool, cq.Workplane):
+            solids.extend(v for v in tool.vals() if isinstance(v, cq.Shape))
+        else:
+            solids.append(tool)
+
+    if len(solids) == 0:
+        return self
+
+    start = perf_counter()
+    cut = self.findSolid().cut(*solids)
+    log.info("gridfinity_cut_many: cut %d tools in %.3fs", len(solids), perf_counter() - start)
+
+    if clean is None:
+        clean = clean_enabled()
+
+    if clean:
+        cut = cut.clean()
+
+    return self.newObject([cut])
+
+cq.Workplane.gridfinity_cut_many = gridfinity_cut_many
+
+def gridfinity_clean(self):
+    """Run the clean that `deferred_clean` skipped on a finished model.
+
+    Outside of `deferred_clean` every plugin has already cleaned its result,
+    so this does nothing."""
+
+    if clean_enabled():
+        return self
+
+    start = perf_counter()
+    result = self.clean()
+    log.info("gridfinity_clean: cleaned in %.3fs", perf_counter() - start)
+
+    return result
+
+cq.Workplane.gridfinity_clean = gridfinity_clean
+
+def gridfinity_top_face(self, depth):
+    """Select the top surface of a block of a given depth, inside the
+    stacking lip, e.g. to put a workplane on it.
+
+    Pockets already cut into the top surface don't get in the way, since
+    only faces facing up at the height of the top surface are picked."""
+
+    top = block_top_surface(depth)
+
+    return self.faces("+Z").faces(cq.selectors.BoxSelector(
+        (-1e6, -1e6, top - 1e-3), (1e6, 1e6, top + 1e-3)))
+
+cq.Workplane.gridfinity_top_face = gridfinity_top_face
+
+def gridfinity_cut_pockets(self, depth, sketch, cut_depth=None):
+    """Cut pockets down from the top surface of a block of a given depth.
+
+    `sketch` holds the outlines of every pocket, on the top surface, e.g.
+    from `pocket_sketch`. All of them are cut in one go, `cut_depth` deep;
+    by default, as deep as `block_cut_limit` allows."""
+
+    if cut_depth is None:
+        cut_depth = block_cut_limit(depth)
+
+    return self.gridfinity_top_face(depth)\
+        .workplane()\
+        .placeSketch(sketch)\
+        .cutBlind(cut_depth * -1, clean=clean_enabled())
+
+cq.Workplane.gridfinity_cut_pockets = gridfinity_cut_pockets
+
+def gridfinity_fillets(self, requests, strict=True):
+    """Fillet a whole list of edges of the current solid at once.
+
+    `requests` is a list of `(where, radius)` pairs, where `where` is either
+    a point, to pick the edge nearest to it like `cq.NearestToPointSelector`,
+    or a selector (or selector string) picking any number of edges. Every
+    edge is found on the solid as it is now, before any filleting.
+
+    Chaining `.edges(...).fillet(r)` calls rebuilds the whole solid for
+    every fillet. This fillets every edge in one operation, each with its own
+    radius. If the kernel can't do that, the edges are split in half and
+    tried again on the same solid until the edges that are actually at
+    fault are found, and every other edge is filleted in one operation.
+
+    Edges that can't be filleted are reported in a ValueError, or with
+    `strict=False`, logged and left unfilleted. Two requests that pick the
+    same edge with different radii are always a ValueError."""
+
+    solid = self.findSolid()
+    edges = fillet_edges(solid, list(requests))
+
+    if len(edges) == 0:
+        return self
+
+    start = perf_counter()
+    result = fillet_once(solid, edges)
+    failed = []
+
+    if result is None:
+        # Keep edges with the same radius together, so halves tend to line
+        # up with radii.
+        edges.sort(key=lambda e: e[1])
+        failed, filleted = fillet_failures(solid, [], edges)
+        result = fillet_once(solid, filleted) if len(filleted) > 0 else solid
+
+    log.info("gridfinity_fillets: filleted %d edges in %.3fs",
+        len(edges) - len(failed), perf_counter() - start)
+
+    if len(failed) > 0:
+        message = "Could not fillet: " + ", ".join(
+            f"{where} (radius {radius})" for _, radius, where in failed)
+
+        if strict:
+            raise ValueError(message)
+
+        log.warning("gridfinity_fillets: %s", message)
+
+    return self.newObject([result])
+
+cq.Workplane.gridfinity_fillets = gridfinity_fillets
+
+@cached
+def gridfinity_baseplate(self, width, height, magnets=False, weighted=False, seams=(False, False, False, False)):
+    """Create a Gridfinity baseplate of a given width and height.
+
+    Set `magnets=True` to add magnet holes to every socket, and
+    `weighted=True` to add a pocket for a weight under every socket. Either
+    one gives the baseplate a floor; plain baseplates are just a frame.
+
+    For one tile of a bigger baseplate, `seams` says which sides (left,
+    right, bottom, top) meet another tile; the corners on those sides are
+    left square.
+
+    Every socket is cut in one boolean, with a single finished socket tool
+    from `baseplate_socket_cell` placed in each grid cell."""
+
+    depth = baseplate_mating_depth + baseplate_floor(magnets, weighted)
+    socket = baseplate_socket_cell(magnets, weighted)
+
+    return self.placeSketch(baseplate_profile(width, height, tuple(seams)))\
+        .extrude(depth)\
+        .faces(">Z")\
+        .workplane()\
+        .rarray(grid_unit, grid_unit, width, height)\
+        .eachpoint(lambda c: socket.moved(c), combine="cut", clean=clean_enabled())
+
+cq.Workplane.gridfinity_baseplate = gridfinity_baseplate
+
+## Catalogs
+def block_catalog(widths, heights, depths, holes=True):
+    """Build a plain block for every combination of sizes, one at a time.
+
+    Yields `((width, height, depth), block)` pairs, where each block is a
+    Workplane holding a finished block: body, stacking lip and mating lip.
+
+    Blocks are the same when turned through 90 degrees, so each footprint is
+    only built once, and its transpose (e.g. 3x2 for 2x3) is the same solid
+    rotated about Z. Nothing is kept once it has been yielded, so a whole
+    catalog never has to fit in memory."""
+
+    widths, heights, depths = list(widths), list(heights), list(depths)
+    wanted = set((w, h) for w in widths for h in heights)
+    turn = cq.Location(cq.Vector(0, 0, 0), cq.Vector(0, 0, 1), 90)
+
+    for width in widths:
+        for height in heights:
+            # Build the first of each pair of transposed sizes we come to.
+            if width > height and (height, width) in wanted:
+                continue
+
+            for depth in depths:
+                block = cq.Workplane("XY")\
+                    .gridfinity_block(width, height, depth)\
+                    .gridfinity_block_stack(width, height)\
+                    .gridfinity_block_lip(width, height, holes=holes)
+
+                yield (width, height, depth), block
+
+                if width != height and (height, width) in wanted:
+                    yield (height, width, depth), \
+                        cq.Workplane("XY").newObject([block.val().moved(turn)])
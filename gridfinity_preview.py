@@ -0,0 +1,649 @@
+"""Fast triangle-mesh previews of plain Gridfinity bins, without OCCT.
+
+Previews and quotes only need a mesh of a standard bin, so building one
+through `gridfinity_block`, `gridfinity_block_stack`, `gridfinity_block_lip`
+and then tessellating it is mostly wasted time. This builds the same bin
+straight from the dimensions in `gridfinity_dims` with NumPy:
+
+    import gridfinity_preview
+    vertices, triangles = gridfinity_preview.bin_mesh(3, 2, 6)
+    gridfinity_preview.write_stl("bin.stl", (vertices, triangles))
+
+A mesh is a `(vertices, triangles)` pair: an (N, 3) float array of points and
+an (M, 3) int array of counter-clockwise (seen from outside) vertex indices.
+
+Every rounded rectangle in a Gridfinity block is an inset of the same outline
+with the same fillet origins, so each part of the bin is a stack of rings of
+one shape, stitched together with quads:
+
+ * The body is one ring per point of the stacking lip's cross-section.
+ * Each mating lip cell, with its counterbores, is built once and then copied
+   to every cell of the grid.
+
+The body's bottom is zipped up around the top of every mating lip cell, and
+the body's outline has a point wherever a grid line crosses it, so the whole
+bin is welded into one closed, manifold shell. The screw holes stop at the
+top of the mating lip instead of going up into the body, which leaves
+~12mm^3 per hole of extra material in the preview.
+
+`python -m gridfinity_preview check` compares previews against the OCCT
+model (which does need CadQuery)."""
+
+import argparse, functools, sys, time
+from math import ceil, pi
+
+import numpy as np
+
+from gridfinity_dims import *
+
+# Number of segments used for every 90 degrees of fillet.
+arc_steps = 8
+
+# Number of segments for each half of a straight side of a rounded rectangle.
+side_divisions = 4
+
+# Number of segments around each counterbore.
+hole_segments = 32
+
+## Rings
+def rounded_rings(half_width, half_height, profile, steps=arc_steps, divisions=side_divisions,
+                  splits_x=(), splits_y=()):
+    """Calculate rings around a rounded rectangle for every `(inset, z)` row
+    of a profile, as an array of shape (rows, points, 3).
+
+    Every ring has the same number of points, starting at the middle of the +X
+    side and going counter-clockwise, with a point in the middle of each side.
+    The fillets all share their origins with the outside of the grid, so
+    insets must not exceed the fillet radius.
+
+    The straight sides also get a point at every X in `splits_x` and every Y
+    in `splits_y` (and their mirror images), e.g. where grid lines cross
+    them."""
+
+    profile = np.asarray(profile, dtype=float)
+    inset = profile[:, 0:1]
+    radius = fillet_radius - inset
+
+    ox = half_width - fillet_radius
+    oy = half_height - fillet_radius
+
+    t = np.linspace(0, 1, divisions + 1)
+    angles = np.linspace(0, pi / 2, steps + 1)
+
+    # Positions along each side, from its middle to where the fillet starts.
+    xs = np.unique(np.concatenate([ox * t, [s for s in np.abs(splits_x) if s < ox]]))
+    ys = np.unique(np.concatenate([oy * t, [s for s in np.abs(splits_y) if s < oy]]))
+
+    # The first quadrant: up the +X side, around the corner, then along the +Y
+    # side to its middle.
+    x = np.concatenate([
+        np.broadcast_to(half_width - inset, (len(profile), len(ys) - 1)),
+        ox + radius * np.cos(angles),
+        np.broadcast_to(xs[::-1][1:], (len(profile), len(xs) - 1)),
+    ], axis=1)
+    y = np.concatenate([
+        np.broadcast_to(ys[:-1], (len(profile), len(ys) - 1)),
+        oy + radius * np.sin(angles),
+        np.broadcast_to(half_height - inset, (len(profile), len(xs) - 1)),
+    ], axis=1)
+
+    # The other three quadrants are mirror images; reversing the mirrored
+    # ones keeps the ring counter-clockwise.
+    x = np.concatenate([x[:, :-1], -x[:, ::-1][:, :-1], -x[:, :-1], x[:, ::-1][:, :-1]], axis=1)
+    y = np.concatenate([y[:, :-1], y[:, ::-1][:, :-1], -y[:, :-1], -y[:, ::-1][:, :-1]], axis=1)
+    z = np.broadcast_to(profile[:, 1:2], x.shape)
+
+    return np.stack([x, y, z], axis=-1) + 0.0
+
+def circle_rings(center, profile, segments=hole_segments):
+    """Calculate rings around a circle for every `(radius, z)` row of a
+    profile, as an array of shape (rows, points, 3).
+
+    Rings go clockwise, so that stitching them gives faces that point
+    towards the axis, which is what a hole needs."""
+
+    profile = np.asarray(profile, dtype=float)
+    angles = np.linspace(0, pi * -2, segments, endpoint=False)
+
+    x = center[0] + profile[:, 0:1] * np.cos(angles)
+    y = center[1] + profile[:, 0:1] * np.sin(angles)
+    z = np.broadcast_to(profile[:, 1:2], x.shape)
+
+    return np.stack([x, y, z], axis=-1) + 0.0
+
+def stitch(rings):
+    """Join a stack of closed rings with quads, as a mesh.
+
+    Going from one ring to the next, faces point to the right of the
+    direction of travel when looking along the ring's direction; for
+    counter-clockwise rings going up, that's outwards."""
+
+    rows, points, _ = rings.shape
+
+    k = np.arange(rows - 1)[:, None] * points
+    j = np.arange(points)[None, :]
+    a = k + j
+    b = k + (j + 1) % points
+    c = b + points
+    d = a + points
+
+    triangles = np.concatenate([
+        np.stack([a, b, c], axis=-1).reshape(-1, 3),
+        np.stack([a, c, d], axis=-1).reshape(-1, 3),
+    ])
+
+    return rings.reshape(-1, 3), triangles
+
+def fan(ring, up):
+    """Cap a convex ring with a fan of triangles around its centroid."""
+
+    center = ring.mean(axis=0, keepdims=True)
+    j = np.arange(len(ring))
+    k = (j + 1) % len(ring)
+    c = np.full_like(j, len(ring))
+
+    triangles = np.stack([c, j, k] if up else [c, k, j], axis=-1)
+
+    return np.concatenate([ring, center]), triangles
+
+def zipper(outer, inner):
+    """Triangulate the region between an outer polygon and a hole inside it.
+
+    Both are lists of points around the same center, which the outer polygon
+    must be star-shaped around. Points are joined in order of their angle
+    around the center, like closing a zipper."""
+
+    center = inner.mean(axis=0)
+
+    def unwrapped_angles(points, start):
+        angles = np.arctan2(points[:, 1] - center[1], points[:, 0] - center[0])
+        return (angles - start) % (pi * 2)
+
+    start = np.arctan2(outer[0, 1] - center[1], outer[0, 0] - center[0])
+    outer_angles = unwrapped_angles(outer, start)
+    inner_angles = unwrapped_angles(inner, start)
+
+    outer_order = np.argsort(outer_angles)
+    inner_order = np.argsort(inner_angles)
+
+    outer_angles = np.append(outer_angles[outer_order], pi * 2)
+    inner_angles = np.append(inner_angles[inner_order], inner_angles[inner_order[0]] + pi * 2)
+    outer_order = np.append(outer_order, outer_order[0])
+    inner_order = np.append(inner_order, inner_order[0]) + len(outer)
+
+    triangles = []
+    i = j = 0
+
+    while i < len(outer) or j < len(inner):
+        if j == len(inner) or (i < len(outer) and outer_angles[i + 1] < inner_angles[j + 1]):
+            triangles.append((outer_order[i], outer_order[i + 1], inner_order[j]))
+            i += 1
+        else:
+            triangles.append((outer_order[i], inner_order[j + 1], inner_order[j]))
+            j += 1
+
+    return np.concatenate([outer, inner]), np.array(triangles)
+
+def strip(outer, inner):
+    """Triangulate the region between two convex polygons, one inside the
+    other.
+
+    Both are lists of points going counter-clockwise. Unlike `zipper`, the
+    inner polygon can come arbitrarily close to the outer one: each step goes
+    along whichever polygon keeps the new edge clear of the inner one."""
+
+    n, m = len(outer), len(inner)
+    o = outer[:, :2].tolist()
+    f = inner[:, :2].tolist()
+
+    def cross(a, b, c):
+        return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+    def sees(point, k):
+        """Check that the edge from an outer point to inner point `k` stays
+        outside the inner polygon."""
+
+        return cross(f[k - 1], f[k], point) <= 1e-12 or cross(f[k], f[(k + 1) % m], point) <= 1e-12
+
+    def length(a, b):
+        return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2
+
+    j = min((k for k in range(m) if sees(o[0], k)), key=lambda k: length(o[0], f[k]))
+
+    triangles = []
+    i = done_outer = done_inner = 0
+
+    while done_outer < n or done_inner < m:
+        next_i, next_j = (i + 1) % n, (j + 1) % m
+
+        along_outer = done_outer < n and sees(o[next_i], j)
+        along_inner = done_inner < m and sees(o[i], next_j)
+
+        if along_outer and along_inner:
+            along_outer = length(o[next_i], f[j]) <= length(o[i], f[next_j])
+        elif not along_outer and not along_inner:
+            raise ValueError("Can't triangulate between these polygons")
+
+        if along_outer:
+            triangles.append((i, next_i, n + j))
+            i, done_outer = next_i, done_outer + 1
+        else:
+            triangles.append((i, n + next_j, n + j))
+            j, done_inner = next_j, done_inner + 1
+
+    return np.concatenate([outer, inner]), np.array(triangles)
+
+## Meshes
+def merge(meshes):
+    """Combine several meshes into one."""
+
+    vertices = []
+    triangles = []
+    offset = 0
+
+    for v, t in meshes:
+        vertices.append(v)
+        triangles.append(t + offset)
+        offset += len(v)
+
+    return np.concatenate(vertices), np.concatenate(triangles)
+
+def weld(mesh):
+    """Merge vertices that are exactly equal, so that separately built parts
+    of a shell share their edges."""
+
+    vertices, triangles = mesh
+    vertices, inverse = np.unique(vertices, axis=0, return_inverse=True)
+
+    return vertices, inverse.reshape(-1)[triangles]
+
+def face_up(mesh, up):
+    """Flip the triangles of a flat, horizontal mesh to face up or down."""
+
+    vertices, triangles = mesh
+    a, b, c = (vertices[triangles[:, i]] for i in range(3))
+    normal_z = np.cross(b - a, c - a)[:, 2]
+
+    flip = (normal_z < 0) if up else (normal_z > 0)
+    triangles = triangles.copy()
+    triangles[flip] = triangles[flip][:, ::-1]
+
+    return vertices, triangles
+
+def tile(mesh, offsets):
+    """Copy a mesh to each of a list of XYZ offsets."""
+
+    vertices, triangles = mesh
+    offsets = np.asarray(offsets, dtype=float)
+
+    all_vertices = (vertices[None, :, :] + offsets[:, None, :]).reshape(-1, 3)
+    all_triangles = (triangles[None, :, :] + (np.arange(len(offsets)) * len(vertices))[:, None, None]).reshape(-1, 3)
+
+    return all_vertices, all_triangles
+
+## Parts
+def sample_profile(segments, steps=arc_steps):
+    """Turn a cross-section made of lines and three-point arcs (see
+    `stacking_lip_profile`) into a list of points."""
+
+    points = []
+
+    for segment in segments:
+        if len(segment) == 2:
+            points.append(segment[0])
+            continue
+
+        (x0, y0), (x1, y1), (x2, y2) = segment
+
+        # Center of the circle through all three points.
+        d = 2 * (x0 * (y1 - y2) + x1 * (y2 - y0) + x2 * (y0 - y1))
+        cx = ((x0 ** 2 + y0 ** 2) * (y1 - y2) + (x1 ** 2 + y1 ** 2) * (y2 - y0) + (x2 ** 2 + y2 ** 2) * (y0 - y1)) / d
+        cy = ((x0 ** 2 + y0 ** 2) * (x2 - x1) + (x1 ** 2 + y1 ** 2) * (x0 - x2) + (x2 ** 2 + y2 ** 2) * (x1 - x0)) / d
+
+        a0 = np.arctan2(y0 - cy, x0 - cx)
+        a1 = np.arctan2(y1 - cy, x1 - cx)
+        a2 = np.arctan2(y2 - cy, x2 - cx)
+
+        # Go around whichever way passes through the middle point.
+        sweep = (a2 - a0) % (pi * 2)
+        if (a1 - a0) % (pi * 2) > sweep:
+            sweep -= pi * 2
+
+        count = max(1, ceil(abs(sweep) / (pi / 2) * steps))
+        angles = a0 + sweep * np.arange(count) / count
+        radius = np.hypot(x0 - cx, y0 - cy)
+
+        points.extend(zip(cx + radius * np.cos(angles), cy + radius * np.sin(angles)))
+
+    points.append(segments[-1][-1])
+
+    return np.array(points, dtype=float)
+
+def grid_lines(length):
+    """List the positions of the grid lines across a block some number of
+    grid units long, centered on the origin."""
+
+    return (np.arange(length + 1) - length / 2) * grid_unit
+
+def cell_offsets(width, height):
+    """List the centers of every grid cell of a block, as XYZ offsets, column
+    by column."""
+
+    cx = (np.arange(width) - (width - 1) / 2) * grid_unit
+    cy = (np.arange(height) - (height - 1) / 2) * grid_unit
+
+    return np.stack(np.meshgrid(cx, cy, [0], indexing="ij"), axis=-1).reshape(-1, 3)
+
+def body_bottom(ring, width, height, footprint):
+    """Mesh the bottom of the body around the top of every mating lip cell.
+
+    `ring` is the bottom ring of the body, which must have a point wherever
+    a grid line crosses it, and `footprint` is the top ring of one cell,
+    centered on the origin. Each grid cell's share of the bottom is convex,
+    so it is stitched up around its own cell with `strip`."""
+
+    lines_x, lines_y = grid_lines(width), grid_lines(height)
+    offsets = cell_offsets(width, height)
+    parts = []
+
+    for i in range(width):
+        for j in range(height):
+            x0, x1, y0, y1 = lines_x[i], lines_x[i + 1], lines_y[j], lines_y[j + 1]
+
+            inside = (ring[:, 0] >= x0 - 1e-9) & (ring[:, 0] <= x1 + 1e-9) \
+                & (ring[:, 1] >= y0 - 1e-9) & (ring[:, 1] <= y1 + 1e-9)
+
+            # Corners of the cell that aren't on the outside of the block are
+            # shared with the neighbouring cells.
+            corners = [(x, y, 0.0) for x in (x0, x1) for y in (y0, y1)
+                       if lines_x[0] < x < lines_x[-1] and lines_y[0] < y < lines_y[-1]]
+
+            center = offsets[i * height + j]
+            outline = np.concatenate([ring[inside], np.array(corners).reshape(-1, 3)])
+            outline = outline[np.argsort(np.arctan2(outline[:, 1] - center[1], outline[:, 0] - center[0]))]
+
+            parts.append(strip(outline, footprint + center))
+
+    return face_up(weld(merge(parts)), up=False)
+
+def body_mesh(width, height, depth, steps=arc_steps):
+    """Mesh the body of a block, from the top of the mating lip at Z=0 up to
+    and including the stacking lip.
+
+    The bottom of the body is left open where each grid cell's mating lip
+    joins on."""
+
+    top = block_extrusion(depth)
+    profile = sample_profile(stacking_lip_profile(), steps)
+
+    # The lip's cross-section starts at the stacking pocket's floor; the
+    # outer wall goes all the way down to the bottom of the body.
+    profile[0, 1] = top * -1
+    profile[:, 1] += top
+
+    rings = rounded_rings(width * grid_unit / 2, height * grid_unit / 2, profile, steps,
+        splits_x=grid_lines(width)[1:-1], splits_y=grid_lines(height)[1:-1])
+
+    return weld(merge([
+        stitch(rings),
+        body_bottom(rings[0], width, height, cell_rings(steps)[-1]),
+        fan(rings[-1], up=True),
+    ]))
+
+def cell_cap(inset, z, hole_rings, steps=arc_steps):
+    """Mesh a horizontal rounded rectangle for one grid cell with a hole in
+    each quadrant.
+
+    Each quadrant is zipped up separately, so it only has to be star-shaped
+    around its own hole."""
+
+    ring = rounded_rings(grid_unit / 2, grid_unit / 2, [(inset, z)], steps)[0]
+    quadrant = len(ring) // 4
+
+    axis = np.linspace(0, 1, side_divisions + 1)[:, None]
+    x_axis = np.concatenate([axis * (grid_unit / 2 - inset), axis * 0, axis * 0 + z], axis=1)[:-1] + 0.0
+    y_axis = x_axis[:, [1, 0, 2]]
+
+    parts = []
+
+    for q, hole in enumerate(hole_rings):
+        sx = -1 if q in (1, 2) else 1
+        sy = -1 if q in (2, 3) else 1
+
+        side = np.roll(ring, -q * quadrant, axis=0)[:quadrant + 1]
+        first, second = (x_axis, y_axis) if q % 2 == 0 else (y_axis, x_axis)
+
+        outline = np.concatenate([
+            first[::-1] * (sx, sy, 1),
+            side,
+            second[1:] * (sx, sy, 1),
+        ]) + 0.0
+
+        parts.append(zipper(outline, hole))
+
+    return weld(merge(parts))
+
+def cell_profile():
+    """List the `(inset, z)` rows of the mating lip of a grid cell, from the
+    bottom up to where it joins the body at Z=0."""
+
+    chamfer = block_mating_inset - block_spacing * 0.5 - 0.01
+    bottom = block_mating_depth * -1
+
+    return [
+        (block_mating_inset + block_mating_chamfer, bottom),
+        (block_mating_inset, bottom + block_mating_chamfer),
+        (block_mating_inset, chamfer * -1),
+        (block_mating_inset - chamfer, 0),
+    ]
+
+def cell_rings(steps=arc_steps):
+    """Calculate the rings of the mating lip of a grid cell, centered on the
+    origin."""
+
+    return rounded_rings(grid_unit / 2, grid_unit / 2, cell_profile(), steps)
+
+def cell_mesh(holes=True, screw_depth=screw_depth, steps=arc_steps, top=True):
+    """Mesh the mating lip of a single grid cell, centered on the origin.
+
+    This is the same shape as `block_lip_cell`, plus the counterbores from
+    `gridfinity_block_lip`.
+
+    Set `top=False` to leave the top of the cell open, so it can be joined
+    onto the bottom of a body; screw holes that go up through the whole cell
+    then get a ceiling where the body begins."""
+
+    profile = cell_profile()
+    bottom = profile[0][1]
+
+    rings = cell_rings(steps)
+    wall = stitch(rings)
+    lid = [fan(rings[-1], up=True)] if top else []
+
+    if not holes:
+        return weld(merge([wall, fan(rings[0], up=False), *lid]))
+
+    # The counterbores go up through the whole cell, and stop where the body
+    # begins.
+    shelf = bottom + magnet_depth
+    offset = grid_unit / 2 - magnet_inset
+    centers = [(offset, offset), (-offset, offset), (-offset, -offset), (offset, -offset)]
+
+    bores = [circle_rings(c, [
+        (magnet_diameter / 2, bottom),
+        (magnet_diameter / 2, shelf),
+        (screw_diameter / 2, shelf),
+        (screw_diameter / 2, 0),
+    ]) for c in centers]
+
+    if screw_depth is not None and bottom + screw_depth < 0:
+        # Blind screw holes get a ceiling instead of reaching the body.
+        ceiling = bottom + screw_depth
+        bores = [np.concatenate([b[:3], b[2:3] * (1, 1, 0) + (0, 0, ceiling)]) for b in bores]
+        ceilings = [face_up(fan(b[-1], up=False), up=False) for b in bores]
+    elif top:
+        ceilings = []
+        lid = [face_up(cell_cap(profile[-1][0], 0, [b[-1] for b in bores], steps), up=True)]
+    else:
+        ceilings = [face_up(fan(b[-1], up=False), up=False) for b in bores]
+
+    return weld(merge([
+        wall,
+        face_up(cell_cap(profile[0][0], bottom, [b[0] for b in bores], steps), up=False),
+        *lid,
+        *(stitch(b) for b in bores),
+        *ceilings,
+    ]))
+
+@functools.lru_cache(maxsize=8)
+def _cell_mesh(holes, screw_depth, steps, top):
+    return cell_mesh(holes, screw_depth, steps, top)
+
+def bin_mesh(width, height, depth, holes=True, screw_depth=screw_depth, steps=arc_steps):
+    """Mesh a plain Gridfinity bin: the same shape as
+
+        cq.Workplane("XY")\\
+            .gridfinity_block(width, height, depth)\\
+            .gridfinity_block_stack(width, height)\\
+            .gridfinity_block_lip(width, height, screw_depth, holes)
+
+    `steps` is the number of segments per 90 degrees of fillet."""
+
+    return weld(merge([
+        body_mesh(width, height, depth, steps),
+        tile(_cell_mesh(holes, screw_depth, steps, False), cell_offsets(width, height)),
+    ]))
+
+## Measurements
+def is_watertight(mesh):
+    """Check that every edge of a mesh is shared by exactly two triangles,
+    which use it in opposite directions."""
+
+    _, triangles = mesh
+    edges = np.concatenate([triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]])
+
+    forward, counts = np.unique(edges, axis=0, return_counts=True)
+    if (counts != 1).any():
+        return False
+
+    backward = np.unique(edges[:, ::-1], axis=0)
+
+    return len(forward) == len(backward) and (forward == backward).all()
+
+def volume(mesh):
+    """Calculate the volume enclosed by a closed mesh."""
+
+    vertices, triangles = mesh
+    a, b, c = (vertices[triangles[:, i]] for i in range(3))
+
+    return np.einsum("ij,ij->i", a, np.cross(b, c)).sum() / 6
+
+def bounding_box(mesh):
+    """Return the (min, max) corners of a mesh's bounding box."""
+
+    vertices, _ = mesh
+
+    return vertices.min(axis=0), vertices.max(axis=0)
+
+def write_stl(path, mesh):
+    """Write a mesh as a binary STL file."""
+
+    vertices, triangles = mesh
+    a, b, c = (vertices[triangles[:, i]] for i in range(3))
+
+    normals = np.cross(b - a, c - a)
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+
+    records = np.zeros(len(triangles), dtype=[
+        ("normal", "<f4", 3), ("a", "<f4", 3), ("b", "<f4", 3), ("c", "<f4", 3), ("attributes", "<u2")])
+    records["normal"], records["a"], records["b"], records["c"] = normals, a, b, c
+
+    with open(path, "wb") as f:
+        f.write(b"gridfinity_preview".ljust(80, b"\0"))
+        f.write(np.uint32(len(triangles)).tobytes())
+        f.write(records.tobytes())
+
+def compare_to_occt(width, height, depth, holes=True):
+    """Build the same bin with CadQuery and compare it to its preview.
+
+    Returns a dict with both volumes, their relative difference, the largest
+    difference between the corners of the bounding boxes, and the time each
+    one took to build."""
+    import cadquery as cq
+    import gridfinity, gridfinity_cache
+
+    gridfinity_cache.configure(None)
+
+    start = time.perf_counter()
+    mesh = bin_mesh(width, height, depth, holes)
+    preview_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    solid = cq.Workplane("XY")\
+        .gridfinity_block(width, height, depth)\
+        .gridfinity_block_stack(width, height)\
+        .gridfinity_block_lip(width, height, holes=holes)\
+        .findSolid()
+    occt_time = time.perf_counter() - start
+
+    box = solid.BoundingBox()
+    occt_box = np.array([[box.xmin, box.ymin, box.zmin], [box.xmax, box.ymax, box.zmax]])
+
+    return {
+        "watertight": is_watertight(mesh),
+        "volume": volume(mesh),
+        "occt_volume": solid.Volume(),
+        "volume_error": abs(volume(mesh) / solid.Volume() - 1),
+        "bbox_error": float(np.abs(np.array(bounding_box(mesh)) - occt_box).max()),
+        "preview_time": preview_time,
+        "occt_time": occt_time,
+    }
+
+def check(args):
+    failures = 0
+
+    for width, height, depth in [(1, 1, 2), (2, 1, 3), (3, 3, 6), (4, 2, 3)]:
+        result = compare_to_occt(width, height, depth)
+        ok = result["watertight"] and result["volume_error"] <= args.volume_tolerance \
+            and result["bbox_error"] <= args.bbox_tolerance
+
+        print(f"{width}x{height}x{depth}: {'ok' if ok else 'FAILED'} "
+              f"watertight={result['watertight']} volume error {result['volume_error'] * 100:.3f}% "
+              f"bbox error {result['bbox_error']:.4f}mm "
+              f"({result['preview_time'] * 1000:.1f}ms vs {result['occt_time'] * 1000:.0f}ms)")
+
+        failures += not ok
+
+    return 1 if failures else 0
+
+def stl(args):
+    write_stl(args.output, bin_mesh(args.width, args.height, args.depth, holes=not args.no_holes))
+
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="gridfinity_preview", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    stl_parser = commands.add_parser("stl", help="write a preview of a bin as an STL file")
+    stl_parser.add_argument("width", type=int)
+    stl_parser.add_argument("height", type=int)
+    stl_parser.add_argument("depth", type=int)
+    stl_parser.add_argument("-o", "--output", default="preview.stl", help="STL file to write")
+    stl_parser.add_argument("--no-holes", action="store_true", help="leave out the counterbores")
+    stl_parser.set_defaults(func=stl)
+
+    check_parser = commands.add_parser("check", help="compare previews against the OCCT model")
+    check_parser.add_argument("--volume-tolerance", type=float, default=0.005,
+        help="largest allowed relative volume difference (default: %(default)s)")
+    check_parser.add_argument("--bbox-tolerance", type=float, default=0.05,
+        help="largest allowed bounding box difference in mm (default: %(default)s)")
+    check_parser.set_defaults(func=check)
+
+    args = parser.parse_args(argv)
+
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""Vectorized sizing calculations for whole catalogs of Gridfinity blocks.
+
+The dimension helpers in `gridfinity_dims` are plain arithmetic, so they work
+on NumPy arrays as well as on numbers. This module wraps them to take arrays
+of block sizes, and adds a calculator for the space each block offers:
+
+    import gridfinity_sizing
+    widths, heights, depths = gridfinity_sizing.size_grid(range(1, 9), range(1, 9), range(2, 13))
+    sizes = gridfinity_sizing.block_capacity(widths, heights, depths)
+    sizes["usable_volume"]  # mm^3, one entry per (width, height, depth)
+
+All of this only needs NumPy, never CadQuery. Check the array versions
+against values worked out without NumPy with `python -m gridfinity_sizing`."""
+
+import sys
+
+import numpy as np
+
+import gridfinity_dims
+
+def block_extrusion(depth):
+    """Array version of `gridfinity_dims.block_extrusion`."""
+    return gridfinity_dims.block_extrusion(np.asarray(depth, dtype=float))
+
+def block_top_surface(depth):
+    """Array version of `gridfinity_dims.block_top_surface`."""
+    return gridfinity_dims.block_top_surface(np.asarray(depth, dtype=float))
+
+def block_cut_limit(depth):
+    """Array version of `gridfinity_dims.block_cut_limit`."""
+    return gridfinity_dims.block_cut_limit(np.asarray(depth, dtype=float))
+
+def top_surface_length(length):
+    """Array version of `gridfinity_dims.top_surface_length`."""
+    return gridfinity_dims.top_surface_length(np.asarray(length, dtype=float))
+
+def top_surface_area(width, height):
+    """Array version of `gridfinity_dims.top_surface_area`."""
+    return gridfinity_dims.top_surface_area(np.asarray(width, dtype=float), np.asarray(height, dtype=float))
+
+def size_grid(widths, heights, depths):
+    """Expand lists of widths, heights and depths into every combination of
+    them, as three arrays indexed by [width, height, depth]."""
+
+    return np.meshgrid(np.asarray(widths), np.asarray(heights), np.asarray(depths), indexing="ij")
+
+def block_capacity(width, height, depth):
+    """Calculate the space a block offers for every size in a set of arrays.
+
+    The arrays are broadcast against each other. Returns a dict of arrays:
+
+     * `top_surface`: height of the top surface, in mm.
+     * `top_area`: area of the top surface inside the stacking lip, in mm^2.
+     * `cut_budget`: how deep you can cut into the top surface without
+       reaching the screw counterbores, in mm.
+     * `usable_volume`: volume that can be cut out of the block from the top
+       surface within the cut budget, in mm^3."""
+
+    width, height, depth = np.broadcast_arrays(
+        np.asarray(width, dtype=float), np.asarray(height, dtype=float), np.asarray(depth, dtype=float))
+
+    top_area = top_surface_area(width, height)
+    cut_budget = np.maximum(block_cut_limit(depth), 0)
+
+    return {
+        "top_surface": block_top_surface(depth),
+        "top_area": top_area,
+        "cut_budget": cut_budget,
+        "usable_volume": top_area * cut_budget,
+    }
+
+# Values worked out by hand from the dimensions in `gridfinity_dims`, as
+# (helper, arguments, expected) triples.
+known_values = [
+    ("block_extrusion", (3,), 7 * 3 - 0.954),
+    ("block_top_surface", (3,), 7 * 3 - 0.954 - 3.796),
+    ("block_cut_limit", (3,), 15.0),
+    ("block_cut_limit", (6,), 36.0),
+    ("top_surface_length", (1,), 42 - 2.4 * 2 - 0.69645 * 2),
+    ("top_surface_length", (2,), 84 - 2.4 * 2 - 0.69645 * 2),
+    ("top_surface_area", (1, 1), 35.8071 ** 2 - (4 - np.pi) * 0.90355 ** 2),
+    ("top_surface_area", (2, 3), 77.8071 * 119.8071 - (4 - np.pi) * 0.90355 ** 2),
+]
+
+def scalar_capacity(width, height, depth):
+    """Plain-Python version of `block_capacity` for a single block."""
+
+    top_area = gridfinity_dims.top_surface_area(width, height)
+    cut_budget = max(gridfinity_dims.block_cut_limit(depth), 0)
+
+    return {
+        "top_surface": gridfinity_dims.block_top_surface(depth),
+        "top_area": top_area,
+        "cut_budget": cut_budget,
+        "usable_volume": top_area * cut_budget,
+    }
+
+def check_scalar(lengths=range(1, 17), depths=range(0, 25)):
+    """Check the array helpers against values calculated without NumPy,
+    returning a list of (helper, arguments, expected, actual) for every
+    mismatch. A result of the wrong shape is reported with "shape" in place
+    of the arguments.
+
+    Every helper is checked against `known_values`, and against the scalar
+    helpers in `gridfinity_dims` called one plain float at a time. Arrays are
+    mixed with scalars to check broadcasting."""
+
+    mismatches = []
+
+    def check(name, args, expected, actual):
+        if not np.isclose(expected, actual, rtol=0, atol=1e-9):
+            mismatches.append((name, args, expected, float(actual)))
+
+    helpers = {
+        "block_extrusion": block_extrusion,
+        "block_top_surface": block_top_surface,
+        "block_cut_limit": block_cut_limit,
+        "top_surface_length": top_surface_length,
+        "top_surface_area": top_surface_area,
+    }
+
+    for name, args, expected in known_values:
+        check(name, args, expected, helpers[name](*args))
+
+    lengths = [float(length) for length in lengths]
+    depths = [float(depth) for depth in depths]
+
+    for name, values in [
+        ("block_extrusion", depths),
+        ("block_top_surface", depths),
+        ("block_cut_limit", depths),
+        ("top_surface_length", lengths),
+    ]:
+        scalar = getattr(gridfinity_dims, name)
+
+        for value, result in zip(values, helpers[name](values)):
+            check(name, (value,), scalar(value), result)
+
+    # Widths down the rows, heights along the columns, and a plain number.
+    area = top_surface_area(np.array(lengths)[:, None], np.array(lengths))
+    square = top_surface_area(np.array(lengths), lengths[-1])
+
+    if area.shape != (len(lengths), len(lengths)):
+        mismatches.append(("top_surface_area", "shape", (len(lengths), len(lengths)), area.shape))
+        return mismatches
+
+    for i, width in enumerate(lengths):
+        check("top_surface_area", (width, lengths[-1]),
+            gridfinity_dims.top_surface_area(width, lengths[-1]), square[i])
+
+        for j, height in enumerate(lengths):
+            check("top_surface_area", (width, height),
+                gridfinity_dims.top_surface_area(width, height), area[i, j])
+
+    # Every size in a grid, then one depth for a list of widths.
+    widths, heights, grid_depths = size_grid(lengths, lengths[:4], depths)
+    capacity = block_capacity(widths, heights, grid_depths)
+    row = block_capacity(lengths, 1, depths[-1])
+
+    for index in np.ndindex(widths.shape):
+        args = (float(widths[index]), float(heights[index]), float(grid_depths[index]))
+
+        for key, expected in scalar_capacity(*args).items():
+            check(f"block_capacity[{key}]", args, expected, capacity[key][index])
+
+    for i, width in enumerate(lengths):
+        args = (width, 1.0, depths[-1])
+
+        for key, expected in scalar_capacity(*args).items():
+            check(f"block_capacity[{key}]", args, expected, row[key][i])
+
+    return mismatches
+
+if __name__ == "__main__":
+    mismatches = check_scalar()
+
+    for name, args, expected, actual in mismatches:
+        where = f" {args}" if args == "shape" else str(args)
+        print(f"{name}{where}: expected {expected}, array {actual}")
+
+    print("ok" if not mismatches else f"{len(mismatches)} mismatches")
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,206 @@
+"""Split baseplates that are too big for a print bed into tiles.
+
+A drawer-sized baseplate is cut along grid lines into tiles that each fit on
+the bed, with holes for alignment pins along every seam between two tiles:
+
+    plan = gridfinity_tiles.plan_tiles(20, 12, bed=(220, 220))
+    tiles = gridfinity_tiles.build_tiles(plan, magnets=True, jobs=4)
+    plate = gridfinity_tiles.tiled_assembly(plan, tiles)
+
+Most tiles in a big grid are the same: every interior tile, every tile along
+one edge, and so on. A tile turned through 180 degrees is also the same as
+the tile on the opposite side. Only one of each distinct tile is built, in
+parallel worker processes, and the assembly places it wherever it's needed.
+
+Planning only needs `gridfinity_dims`; CadQuery is loaded by the workers
+that build tiles."""
+
+import os, sys, time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from math import ceil
+
+from gridfinity_dims import *
+
+repo_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Bed size of an Ender 3, in millimeters.
+default_bed = (220, 220)
+
+# Space to leave around each tile on the bed, e.g. for a brim.
+default_margin = 5 #mm
+
+# One tile of a plan. `x` and `y` are the center of the tile, in millimeters,
+# with the whole grid centered on the origin. `seams` says which sides of the
+# tile (left, right, bottom, top) meet another tile.
+Tile = namedtuple("Tile", "column row x y width height seams")
+
+def split_length(units, max_units):
+    """Split a length in grid units into as few pieces as possible, none
+    longer than `max_units`, and as even as possible.
+
+    Pieces come in at most two lengths, one unit apart, longest first."""
+
+    count = ceil(units / max_units)
+    base, extra = divmod(units, count)
+
+    return [base + 1] * extra + [base] * (count - extra)
+
+def max_tile_units(bed_length, margin=default_margin):
+    """Calculate how many grid units fit along one side of the print bed."""
+
+    units = int((bed_length - margin * 2) // grid_unit)
+
+    if units < 1:
+        raise ValueError(f"A {bed_length}mm bed doesn't fit a single grid unit")
+
+    return units
+
+def plan_tiles(width, height, bed=default_bed, margin=default_margin):
+    """Split a `width` by `height` grid into tiles that fit on a print bed.
+
+    Returns a list of `Tile`s, row by row from the bottom left."""
+
+    columns = split_length(width, max_tile_units(bed[0], margin))
+    rows = split_length(height, max_tile_units(bed[1], margin))
+
+    tiles = []
+    y = height * grid_unit / -2
+
+    for row, tile_height in enumerate(rows):
+        x = width * grid_unit / -2
+
+        for column, tile_width in enumerate(columns):
+            seams = (column > 0, column < len(columns) - 1, row > 0, row < len(rows) - 1)
+
+            tiles.append(Tile(column, row,
+                x + tile_width * grid_unit / 2, y + tile_height * grid_unit / 2,
+                tile_width, tile_height, seams))
+
+            x += tile_width * grid_unit
+
+        y += tile_height * grid_unit
+
+    return tiles
+
+def tile_key(tile):
+    """Identify which distinct tile a tile of a plan is.
+
+    Returns `(key, turned)`, where `key` is `(width, height, seams)` and
+    `turned` says whether the tile is the keyed tile turned through 180
+    degrees, which swaps its left and right, and bottom and top, seams."""
+
+    left, right, bottom, top = tile.seams
+    key = (tile.width, tile.height, tile.seams)
+    turned = (tile.width, tile.height, (right, left, top, bottom))
+
+    if turned < key:
+        return turned, True
+
+    return key, False
+
+def tile_name(key):
+    """Name a distinct tile, e.g. `tile_5x4_RT` for a 5x4 tile with seams on
+    its right and top."""
+
+    width, height, seams = key
+    sides = "".join(s for s, seam in zip("LRBT", seams) if seam)
+
+    return f"tile_{width}x{height}" + (f"_{sides}" if sides else "")
+
+def seam_pin_height(magnets=False, weighted=False):
+    """Calculate the height of the seam pin holes above the bottom of a
+    baseplate: in the middle of the floor, or low down in the walls of a
+    baseplate without one."""
+
+    return max(baseplate_floor(magnets, weighted) / 2, 1.5)
+
+def seam_pin_positions(width, height, seams):
+    """List the seam pin holes of a tile as `(x, y, dx, dy)`: where each hole
+    starts on the edge of the tile, and the direction it goes in.
+
+    There is one hole wherever a grid line meets a seam, so the holes of two
+    neighbouring tiles always line up, whichever way round they are."""
+
+    half_x, half_y = width * grid_unit / 2, height * grid_unit / 2
+    left, right, bottom, top = seams
+    holes = []
+
+    for k in range(1, height):
+        y = k * grid_unit - half_y
+
+        if left:
+            holes.append((-half_x, y, 1, 0))
+        if right:
+            holes.append((half_x, y, -1, 0))
+
+    for k in range(1, width):
+        x = k * grid_unit - half_x
+
+        if bottom:
+            holes.append((x, -half_y, 0, 1))
+        if top:
+            holes.append((x, half_y, 0, -1))
+
+    return holes
+
+def build_tile(key, magnets=False, weighted=False, pins=True):
+    """Build one distinct tile, centered on the origin.
+
+    This is what each worker process runs. Returns the tile's shape and how
+    long it took to build."""
+
+    sys.path.insert(0, repo_dir)
+
+    import cadquery as cq
+    import gridfinity
+
+    width, height, seams = key
+    start = time.perf_counter()
+
+    plate = cq.Workplane("XY").gridfinity_baseplate(width, height, magnets, weighted, seams)
+
+    if pins:
+        z = seam_pin_height(magnets, weighted)
+
+        # Start each hole a little outside the tile, so it cuts cleanly
+        # through the edge.
+        plate = plate.gridfinity_cut_many([
+            cq.Solid.makeCylinder(seam_pin_diameter / 2, seam_pin_depth + 1,
+                cq.Vector(x - dx, y - dy, z), cq.Vector(dx, dy, 0))
+            for x, y, dx, dy in seam_pin_positions(width, height, seams)])
+
+    return plate.val(), time.perf_counter() - start
+
+def build_tiles(plan, magnets=False, weighted=False, pins=True, jobs=None):
+    """Build every distinct tile of a plan in parallel.
+
+    Returns a dict from tile key to `(shape, build time)`."""
+
+    keys = sorted(set(tile_key(tile)[0] for tile in plan))
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(keys)))
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [(key, pool.submit(build_tile, key, magnets, weighted, pins)) for key in keys]
+
+        return {key: future.result() for key, future in futures}
+
+def tiled_assembly(plan, tiles, gap=0, name=None):
+    """Lay out the tiles of a plan as an assembly, `gap` millimeters apart.
+
+    Every tile refers to the one shape built for its key, so exporting the
+    assembly to STEP or glTF keeps them as instances."""
+    import cadquery as cq
+
+    assembly = cq.Assembly(name=name)
+
+    for tile in plan:
+        key, turned = tile_key(tile)
+        shape = tiles[key][0]
+
+        assembly.add(shape, name=f"tile_{tile.column}_{tile.row}",
+            loc=cq.Location(
+                cq.Vector(tile.x + tile.column * gap, tile.y + tile.row * gap, 0),
+                cq.Vector(0, 0, 1), 180 if turned else 0))
+
+    return assembly
@@ -0,0 +1,153 @@
+"""Opt-in tracing for Workplane plugin chains.
+
+Wraps every Gridfinity plugin, and the core Workplane operations they lean
+on, so that each call is timed and tagged with the face count of the solid
+going in and coming out. Traces export to Chrome's trace-event JSON format,
+which can be opened in chrome://tracing or https://ui.perfetto.dev:
+
+    with gridfinity_trace.trace() as tracer:
+        holder = build_my_holder()
+
+    tracer.save("holder-trace.json")
+
+Model scripts can be traced without editing them:
+
+    python -m gridfinity_trace examples/etc_foot_holder.py -o trace.json
+
+Counting faces takes time too, and that time is included in the duration of
+any traced call that encloses another one."""
+
+import argparse, functools, json, os, runpy, sys, threading
+from contextlib import contextmanager
+from time import perf_counter
+
+repo_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Core Workplane operations to trace alongside the Gridfinity plugins.
+traced_operations = ("cut", "union", "chamfer", "fillet", "eachpoint", "cutEach", "cboreHole")
+
+def face_count(workplane):
+    """Count the faces of the solid a Workplane is working on, or return None
+    if there isn't one."""
+    import cadquery as cq
+
+    if not isinstance(workplane, cq.Workplane):
+        return None
+
+    try:
+        return len(workplane.findSolid().Faces())
+    except ValueError:
+        return None
+
+class Tracer:
+    """Collects timed Workplane calls as Chrome trace events."""
+
+    def __init__(self):
+        self.events = []
+        self.origin = perf_counter()
+
+    def record(self, name, category, start, end, args):
+        self.events.append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self.origin) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        })
+
+    def wrap(self, name, category, method):
+        """Wrap a Workplane method so that every call is recorded."""
+
+        @functools.wraps(method)
+        def inner(workplane, *args, **kwargs):
+            faces_in = face_count(workplane)
+            start = perf_counter()
+
+            try:
+                result = method(workplane, *args, **kwargs)
+            except Exception as e:
+                self.record(name, category, start, perf_counter(),
+                    {"faces_in": faces_in, "error": repr(e)})
+                raise
+
+            end = perf_counter()
+            self.record(name, category, start, end,
+                {"faces_in": faces_in, "faces_out": face_count(result)})
+
+            return result
+
+        return inner
+
+    def to_json(self):
+        return {"traceEvents": self.events, "displayTimeUnit": "ms"}
+
+    def save(self, path):
+        """Write the trace to a Chrome trace-event JSON file."""
+
+        with open(path, "w") as f:
+            json.dump(self.to_json(), f)
+
+    def summary(self, limit=20):
+        """List the slowest calls as (name, seconds, faces in, faces out)."""
+
+        slowest = sorted(self.events, key=lambda e: e["dur"], reverse=True)[:limit]
+
+        return [(e["name"], e["dur"] / 1e6, e["args"].get("faces_in"), e["args"].get("faces_out"))
+                for e in slowest]
+
+@contextmanager
+def trace(tracer=None):
+    """Trace Workplane calls made inside the `with` block.
+
+    The Gridfinity plugins are registered first, so they are traced even if
+    the code being traced hasn't imported `gridfinity` yet. Other plugins
+    registered on Workplane after tracing starts are not traced."""
+    import cadquery as cq
+    import gridfinity_plugins
+
+    if tracer is None:
+        tracer = Tracer()
+
+    names = [(n, "gridfinity") for n in dir(cq.Workplane) if n.startswith("gridfinity_")]
+    names.extend((n, "cadquery") for n in traced_operations)
+
+    originals = {n: cq.Workplane.__dict__[n] for n, _ in names if n in cq.Workplane.__dict__}
+
+    try:
+        for name, category in names:
+            if name in originals:
+                setattr(cq.Workplane, name, tracer.wrap(name, category, originals[name]))
+
+        yield tracer
+    finally:
+        for name, method in originals.items():
+            setattr(cq.Workplane, name, method)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="gridfinity_trace",
+        description="Trace the Workplane calls made by a model script.")
+    parser.add_argument("script", help="model script to run")
+    parser.add_argument("-o", "--output", default="trace.json", help="trace-event JSON file to write")
+    parser.add_argument("-n", "--top", type=int, default=20, help="number of slow calls to list")
+    args = parser.parse_args(argv)
+
+    sys.path[:0] = [os.path.dirname(os.path.abspath(args.script)), repo_dir]
+
+    with trace() as tracer:
+        runpy.run_path(args.script)
+
+    tracer.save(args.output)
+
+    if not any(e["cat"] == "gridfinity" for e in tracer.events):
+        print("warning: no Gridfinity plugin calls were traced", file=sys.stderr)
+
+    for name, seconds, faces_in, faces_out in tracer.summary(args.top):
+        print(f"{name:<28} {seconds:>9.3f}s  faces {faces_in} -> {faces_out}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())